@@ -1,20 +1,55 @@
 from PySide6.QtCore import QThread, Signal, QMutex, QWaitCondition
-from PySide6.QtGui import QPixmap, QImage
+from camera.frame_buffer import FrameRingBuffer
+from camera.frame_subscription import SubscriptionRegistry
+from camera.frame_pacing import FramePacer, PACING_LATEST
+from camera.mjpeg_client import MJPEGCapture
+from camera.capture_writer import CaptureJob, get_capture_writer
+from camera.frame_history import FrameHistory
+from camera.trigger_metrics import TriggerRecord
+from camera.reconnect import ReconnectBackoff
+from camera.camera_configuration_manager import STREAM_PATHS
+from model.inference_service import AIResult, get_inference_service
+from model.preprocess import roi_boxes
 import cv2
 import time
 import os
+from datetime import datetime
+
+# When frames of non-JPEG streams (RTSP/H.264, local cameras) are decoded
+DECODE_ALWAYS = "always"  # Every frame, so get_latest_frame() is always current
+DECODE_ON_DEMAND = "on_demand"  # Only grab() until a trigger, AI request, subscriber or history needs pixels
+
+
+def open_capture(cap, url, open_timeout=5.0, read_timeout=2.0):
+    """
+    Open ``url`` on ``cap``, with FFmpeg open/read timeouts for network streams.
+    
+    Without them a dead RTSP camera can block open() or read() for minutes,
+    which makes the capture loop impossible to stop.
+    """
+    if isinstance(cap, cv2.VideoCapture) and isinstance(url, str) and "://" in url:
+        params = [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(open_timeout * 1000),
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(read_timeout * 1000),
+        ]
+        return cap.open(url, cv2.CAP_FFMPEG, params)
+    return cap.open(url)
 
 class CameraThread(QThread):
     """Thread class for handling camera streaming and operations."""
     
-    # Define signals
-    frame_signal = Signal(QPixmap, str)  # For UI updates (pixmap, camera_name)
+    # Define signals (frames are pulled from frame_buffer, not emitted)
     log_signal = Signal(str)  # For logging messages
     connection_status_signal = Signal(str, str)  # (status, camera_name)
     trigger_completed_signal = Signal(str, str)  # (result, camera_name)
+    trigger_timing_signal = Signal(object, str)  # (TriggerRecord, camera_name) after a successful trigger
+    detection_signal = Signal(object, str)  # (AIResult, camera_name) once the annotated image is written
     
     
-    def __init__(self, ip, port, username, password, camera_name, protocol):
+    def __init__(self, ip, port, username, password, camera_name, protocol,
+                 target_fps=30, pacing=PACING_LATEST, capture_sidecar=False,
+                 history_seconds=0, history_fps=10, auto_reconnect=True, reconnect_max_delay=30,
+                 decode_mode=DECODE_ALWAYS, rois=None):
         """Initialize the camera thread with connection details."""
         super().__init__()
         # Connection parameters
@@ -30,17 +65,52 @@ class CameraThread(QThread):
         self.triggered = False  # Flag for trigger operations
         self.triggered_ai = False
         self.trigger_action = None  # What action to perform when triggered
+        self.trigger_record = None  # Timing of the pending capture trigger
+        self.ai_record = None  # Timing of the pending AI trigger
         
         # Thread synchronization
         self.mutex = QMutex()
-        self.condition = QWaitCondition()
+        self.condition = QWaitCondition()  # Wakes backoff waits when the thread is stopped
+        
+        # Reconnect policy (the same thread keeps retrying until stopped)
+        self.auto_reconnect = auto_reconnect
+        self.backoff = ReconnectBackoff(max_delay=reconnect_max_delay)
+        self.connect_timeout = 5
+        self.read_timeout = 2  # Longest a single read may block, so stop() is honoured quickly
+        self.cap = None  # Capture of the current connection (interrupted by stop())
+        
+        # Watched by the stall watchdog
+        self.streaming = False  # Connected and expected to deliver frames
+        self.connected_at = 0.0
+        self.reconnect_requested = False  # Set by force_reconnect() to drop the current connection
+        
+        # Ring buffer of the latest raw BGR frames (read with get_latest_frame)
+        self.frame_buffer = FrameRingBuffer()
+        
+        # Latest compressed frame of JPEG sources as (bytes, timestamp), saved without re-encoding
+        self.encoded_frame = None
         
-        # Frame buffer
-        self.last_frame = None
+        # Compressed pre-trigger history (disabled when history_seconds is 0)
+        self.history = FrameHistory(history_seconds, history_fps) if history_seconds else None
+        self.history_requests = []  # Pending trigger_at() requests
+        
+        # Frame pacing (drains stale frames and limits the loop to target_fps)
+        self.pacer = FramePacer(target_fps, pacing)
+        if decode_mode not in (DECODE_ALWAYS, DECODE_ON_DEMAND):
+            raise ValueError(f"Unknown decode mode: {decode_mode}")
+        self.decode_mode = decode_mode
+        
+        # Consumers that want converted frames pushed to them (display, AI, ...)
+        self.subscriptions = SubscriptionRegistry()
+        
+        # Regions AI triggers detect in, as normalized [x1, y1, x2, y2] (None = whole frame)
+        self.rois = rois or None
         
         # Output configuration
         self.save_path = "captures"  # Default path for saved images
         self.result_path = "outputs/detections"
+        self.capture_sidecar = capture_sidecar  # Write a .json metadata file next to captures
+        self.capture_writer = get_capture_writer()  # Shared pool that encodes/writes off this thread
         # Create the save directory if it doesn't exist
         if not os.path.exists(self.save_path):
             os.makedirs(self.save_path)
@@ -56,39 +126,94 @@ class CameraThread(QThread):
         self.log_signal.emit(f"🔌 Connecting to {self.camera_name} at {self.ip}...")
         self.connection_status_signal.emit("connecting", self.camera_name)
         
-        # Initialize capture object
-        cap = cv2.VideoCapture()
+        while self._is_active():
+            # Initialize capture object
+            cap = self._create_capture()
+            self.cap = cap
+            
+            # Attempt to connect to camera with timeout
+            if self._connect_with_timeout(cap, url, timeout=self.connect_timeout):
+                self.backoff.reset()
+                self.log_signal.emit(f"✅ Connected to {self.camera_name}")
+                self.connection_status_signal.emit("connected", self.camera_name)
+                self._mark_streaming(True)
+                
+                # Main frame capture loop (returns when the stream is lost, stalled or stopped)
+                try:
+                    self._process_frames(cap)
+                except Exception as e:
+                    self.log_signal.emit(f"❌ Error in {self.camera_name}: {str(e)}")
+                    self.connection_status_signal.emit("disconnected", self.camera_name)
+                finally:
+                    # Ensure proper cleanup
+                    self._mark_streaming(False)
+                    cap.release()
+            else:
+                cap.release()
+                if self._is_active():
+                    self.log_signal.emit(f"❌ Failed to connect to {self.camera_name} (Timeout)")
+                    self.connection_status_signal.emit("disconnected", self.camera_name)
+            
+            if not self.auto_reconnect or not self._is_active():
+                break
+            
+            # Back off before retrying so a rebooting switch isn't hammered by every camera
+            delay = self.backoff.next_delay()
+            self.log_signal.emit(f"🔁 Reconnecting to {self.camera_name} in {delay:.1f}s (attempt {self.backoff.attempts})")
+            self.connection_status_signal.emit("reconnecting", self.camera_name)
+            self._wait(delay)
         
-        # Set buffer size to reduce latency
-        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.cap = None
+        self.active = False
+    
+    def _mark_streaming(self, streaming):
+        """Track whether frames are expected (read by the stall watchdog)."""
+        if streaming:
+            self.connected_at = time.time()
+            self.reconnect_requested = False
+        self.streaming = streaming
+    
+    def last_frame_time(self):
+        """Capture time of the newest frame grabbed on the current connection (0.0 if none)."""
+        return self.pacer.last_timestamp
+    
+    def force_reconnect(self, reason="stall"):
+        """
+        Drop the current connection and reconnect (non-blocking, any thread).
         
-        # Attempt to connect to camera with timeout
-        if not self._connect_with_timeout(cap, url, timeout=2):
-            self.log_signal.emit(f"❌ Failed to connect to {self.camera_name} (Timeout)")
-            self.connection_status_signal.emit("disconnected", self.camera_name)
-            self.active = False
-            cap.release()
-            return
-            
-        self.log_signal.emit(f"✅ Connected to {self.camera_name}")
-        self.connection_status_signal.emit("connected", self.camera_name)     
-        
-        # Main frame capture loop
-        try:
-            self._process_frames(cap)
-        except Exception as e:
-            self.log_signal.emit(f"❌ Error in {self.camera_name}: {str(e)}")
-        finally:
-            # Ensure proper cleanup
-            cap.release()
+        The capture loop notices on its next frame or read timeout; blocking
+        MJPEG reads are interrupted right away.
+        """
+        if not self.streaming:
+            return False
+        self.log_signal.emit(f"🐢 {self.camera_name} {reason}, forcing reconnect")
+        self.reconnect_requested = True
+        cap = self.cap
+        if cap is not None and hasattr(cap, "interrupt"):
+            cap.interrupt()
+        return True
+    
+    def _is_active(self):
+        """Thread-safe read of the active flag."""
+        self.mutex.lock()
+        active = self.active
+        self.mutex.unlock()
+        return active
+    
+    def _wait(self, seconds):
+        """Sleep that returns early when stop() is called."""
+        self.mutex.lock()
+        if self.active:
+            self.condition.wait(self.mutex, int(seconds * 1000))
+        self.mutex.unlock()
     
     def _build_camera_url(self):
         """Build the camera URL string based on protocol."""
         if self.protocol == "RTSP":
             # More generic RTSP URL format
-            return f"rtsp://{self.username}:{self.password}@{self.ip}:{self.port}/stream1"
+            return f"rtsp://{self.username}:{self.password}@{self.ip}:{self.port}{STREAM_PATHS['RTSP']}"
         elif self.protocol == "HTTP":
-            return f"http://{self.username}:{self.password}@{self.ip}:{self.port}/video"
+            return f"http://{self.username}:{self.password}@{self.ip}:{self.port}{STREAM_PATHS['HTTP']}"
         else:
             # Try to use as local camera index
             try:
@@ -97,53 +222,72 @@ class CameraThread(QThread):
                 # Default to generic URL format
                 return f"{self.protocol}://{self.username}:{self.password}@{self.ip}:{self.port}"
     
-    def _connect_with_timeout(self, cap, url, timeout=2):
-        """Try to connect to the camera with a timeout."""
+    def _create_capture(self):
+        """Create the capture object matching the protocol."""
+        if self.protocol == "HTTP":
+            # MJPEG over HTTP is read on the shared asyncio loop, decoded on demand
+            return MJPEGCapture()
+        
+        cap = cv2.VideoCapture()
+        # Set buffer size to reduce latency
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+    
+    def _needs_pixels(self, cap):
+        """Check whether the grabbed frame has to be decoded."""
+        compressed = getattr(cap, "compressed", False)
+        if self.decode_mode == DECODE_ALWAYS and not compressed:
+            return True
+        if self.subscriptions.has_subscribers() or self.triggered_ai:
+            return True
+        if compressed:
+            # Captures and history of JPEG sources use the original bytes
+            return False
+        # Raw streams have nothing to save unless the frame is decoded
+        return self.triggered or (self.history is not None and self.history.wants(time.time()))
+    
+    def _connect_with_timeout(self, cap, url, timeout=5):
+        """Open the camera once and wait for its first frame (no rapid reopen loop)."""
         start_time = time.time()
+        if not open_capture(cap, url, timeout, self.read_timeout) and not cap.isOpened():
+            return False
         
-        # First attempt to open
-        cap.open(url)
-        
-        # Check connection with timeout
-        while time.time() - start_time < timeout:
-            if cap.isOpened():
-                # Test if we can actually get a frame
-                ret, _ = cap.read()
-                if ret:
-                    return True
-            
-            # Check if we should stop trying
-            self.mutex.lock()
-            if not self.active:
-                self.mutex.unlock()
-                return False
-            self.mutex.unlock()
-            
-            # Wait a bit before trying again
-            time.sleep(0.1)  # Shorter sleep to be more responsive
-            
-            # Only try reopening if we're still within timeout
-            if time.time() - start_time < timeout - 0.2:
-                cap.release()  # Make sure to release before reopening
-                cap.open(url)
+        # Wait for a first frame with timeout
+        while time.time() - start_time < timeout and self._is_active():
+            # Test if we can actually get a frame
+            ret, _ = cap.read()
+            if ret:
+                return True
+            time.sleep(0.1)
         
         # If we get here, we've timed out
-        cap.release()  # Make sure to release the capture
         return False
             
     def _process_frames(self, cap):
         """Process frames from the camera in a loop."""
         
         while self.active:
-            # Read frame with timeout handling
-            ret, frame = cap.read()
+            # Keep the stream current without decoding; the decision to decode is made
+            # after the grab so a trigger that arrived meanwhile gets this frame
+            ret, timestamp = self.pacer.grab(cap)
+            frame = None
+            if ret and self._needs_pixels(cap):
+                # Decode straight into the next ring buffer slot
+                ret, frame = cap.retrieve(self.frame_buffer.write_slot())
+            
+            if self.reconnect_requested:
+                self.connection_status_signal.emit("disconnected", self.camera_name)
+                break  # Dropped by the stall watchdog; run() reconnects
+            
+            if not ret and not self._is_active():
+                break  # Read was interrupted by stop()
             
             if not ret:
                 # Try a couple more times before giving up
                 retries = 3
                 while retries > 0 and self.active:
                     time.sleep(0.1)
-                    ret, frame = cap.read()
+                    ret, frame, timestamp = self.pacer.read(cap)
                     if ret:
                         break
                     retries -= 1
@@ -153,39 +297,26 @@ class CameraThread(QThread):
                     self.connection_status_signal.emit("disconnected", self.camera_name)
                     break
 
-            # Convert to RGB format for display
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            jpeg = None
+            if getattr(cap, "compressed", False):
+                # Keep the original JPEG for passthrough captures
+                jpeg = cap.latest_jpeg()
+                self.encoded_frame = (jpeg, timestamp)
             
-            # Thread-safe operations on shared state
-            self.mutex.lock()
+            sequence = 0
+            if frame is not None:
+                # Publish the frame; conversions only happen for live subscribers
+                sequence = self.frame_buffer.commit(frame, timestamp)
+                self.subscriptions.dispatch(frame, sequence, timestamp)
             
-            # Store the last frame for trigger processing (in BGR format)
-            self.last_frame = frame.copy()
+            if self.history is not None:
+                self._record_history(frame, jpeg, timestamp, sequence)
             
-            # Check if we've been triggered
-            if self.triggered:
-                self._process_trigger()
-                self.triggered = False
-                
-            # Check if run AI
-            if self.triggered_ai:
-                self._process_ai()
-                self.triggered_ai = False
-                
-            # Can release the lock before UI operations
-            self.mutex.unlock()
-            
-            # Convert to QImage - this can be slow so do it outside the lock
-            h, w, ch = rgb_frame.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
+            # AI triggers always wait for a frame decoded in this iteration
+            self._process_pending_triggers(decoded=frame is not None)
             
-            # Convert to pixmap and emit signal
-            pixmap = QPixmap.fromImage(qt_image)
-            self.frame_signal.emit(pixmap, self.camera_name)
-            
-            # Reduce CPU usage - adjust based on desired frame rate
-            time.sleep(0.03)  # ~30 fps max
+            # Sleep only for what is left of the target frame interval
+            self.pacer.wait()
             
             # Check if we should stop - thread-safe way
             self.mutex.lock()
@@ -195,25 +326,150 @@ class CameraThread(QThread):
             if not should_continue:
                 break
     
+    def _process_pending_triggers(self, decoded=True):
+        """Run any trigger requested since the last frame."""
+        jobs = []  # Captures to hand to the writer once the mutex is released
+        
+        # Thread-safe operations on shared state
+        self.mutex.lock()
+        
+        # Check if we've been triggered
+        if self.triggered and (decoded or self.encoded_frame is not None):
+            self._process_trigger(jobs)
+            self.triggered = False
+            
+        # Check if run AI
+        if self.triggered_ai and decoded:
+            self._process_ai()
+            self.triggered_ai = False
+        
+        # Serve history requests whose frames are all available
+        if self.history_requests:
+            self._process_history_requests(jobs)
+            
+        self.mutex.unlock()
+        
+        # A full writer queue may block here (policy "block"); trigger() and stop() must not wait on it
+        for job in jobs:
+            self.capture_writer.submit(job)
+    
+    def _record_history(self, frame, jpeg, timestamp, sequence):
+        """Add the current frame to the pre-trigger history if it is due."""
+        if not self.history.wants(timestamp):
+            return
+        if jpeg is not None:
+            self.history.add_jpeg(jpeg, timestamp, sequence)
+        elif frame is not None:
+            self.history.add_frame(frame, timestamp, sequence)
+    
+    def get_latest_frame(self, out=None):
+        """
+        Pull the newest frame captured by this camera.
+        
+        Args:
+            out (np.ndarray): Optional array to copy the frame into (avoids allocation)
+            
+        Returns:
+            tuple: (BGR frame or None, sequence number, capture timestamp)
+        """
+        return self.frame_buffer.latest(out)
+    
+    def get_frame_age(self):
+        """Return seconds since the newest frame was grabbed (None if no frame yet)."""
+        # Based on the grab, not the decoded buffer: compressed sources only decode on demand
+        timestamp = self.last_frame_time()
+        return time.time() - timestamp if timestamp else None
+    
+    def get_stats(self):
+        """Return live stream measurements for this camera."""
+        age = self.get_frame_age()
+        return {
+            "fps": round(self.pacer.fps, 1),
+            "frame_age_ms": round(age * 1000, 1) if age is not None else None,
+            "drained_frames": self.pacer.drained_frames,
+        }
+    
+    def subscribe(self, consumer, callback, size=None, pixel_format="BGR", max_fps=30.0):
+        """
+        Register a consumer for converted frames of this camera.
+        
+        The callback runs on the camera thread as callback(frame, sequence, timestamp)
+        and must hand heavy work off to its own thread.
+        
+        Returns:
+            FrameSubscription: Handle to pass to unsubscribe()
+        """
+        return self.subscriptions.subscribe(consumer, callback, size, pixel_format, max_fps)
+    
+    def unsubscribe(self, subscription):
+        """Remove a subscription by handle or consumer name."""
+        return self.subscriptions.unsubscribe(subscription)
+    
     def stop(self):
         """Stop the camera thread safely."""
         self.mutex.lock()
         self.active = False
         self.mutex.unlock()
         self.condition.wakeAll()
+        
+        # Wake a blocking grab() right away where the capture supports it;
+        # OpenCV captures return within read_timeout instead
+        cap = self.cap
+        if cap is not None and hasattr(cap, "interrupt"):
+            cap.interrupt()
     
     def trigger(self, action="capture"):
-        """Trigger the camera to perform an action on the next frame."""
+        """
+        Trigger the camera to perform an action on the next frame.
+        
+        Returns:
+            str: Trigger id used in timing reports, or False if the camera is not active
+        """
         if not self.active:
             self.log_signal.emit(f"⚠️ Cannot trigger {self.camera_name}: Camera not active")
             self.trigger_completed_signal.emit("error", self.camera_name)
             return False
             
+        record = TriggerRecord(self.camera_name, action)
         self.mutex.lock()
         self.triggered = True
         self.trigger_action = action
+        self.trigger_record = record
         self.mutex.unlock()
-        return True
+        return record.trigger_id
+    
+    def trigger_at(self, timestamp, frames_before=0, frames_after=0):
+        """
+        Capture from the pre-trigger history instead of the next frame.
+        
+        Args:
+            timestamp (float): Time of the real event (time.time() clock)
+            frames_before (int): Extra frames to save from before the event
+            frames_after (int): Extra frames to save from after the event
+            
+        With both counts at 0 only the frame closest to ``timestamp`` is saved.
+        """
+        if self.history is None:
+            # No history configured: fall back to the next frame
+            return self.trigger("capture")
+        if not self.active:
+            self.log_signal.emit(f"⚠️ Cannot trigger {self.camera_name}: Camera not active")
+            self.trigger_completed_signal.emit("error", self.camera_name)
+            return False
+        
+        # Give up waiting for frames after the event once they should long have arrived
+        interval = max(self.history.min_interval, self.pacer.frame_interval)
+        record = TriggerRecord(self.camera_name, "history")
+        self.mutex.lock()
+        self.history_requests.append({
+            "timestamp": timestamp,
+            "before": frames_before,
+            "after": frames_after,
+            "deadline": time.time() + (frames_after + 1) * interval + 1.0,
+            "record": record,
+        })
+        self.mutex.unlock()
+        return record.trigger_id
     
     def trigger_and_process(self):
         """Trigger the camera to perform an action on the next frame."""
@@ -222,27 +478,46 @@ class CameraThread(QThread):
             self.trigger_completed_signal.emit("error", self.camera_name)
             return False
             
+        record = TriggerRecord(self.camera_name, "ai")
         self.mutex.lock()
         self.triggered_ai = True
+        self.ai_record = record
         self.mutex.unlock()
-        return True
+        return record.trigger_id
     
       
-    def _process_trigger(self):
-        """Process the triggered action on the current frame."""
+    def _process_trigger(self, jobs):
+        """Process the triggered action on the current frame (mutex held; captures are appended to ``jobs``)."""
         if self.trigger_action == "capture":
             # Save the current frame to file
             timestamp = time.strftime("%Y%m%d_%H%M%S")
             filename = f"{self.save_path}/{self.camera_name}_{timestamp}.jpg"
+            frame, sequence, captured_at = self.get_latest_frame()
+            record = self.trigger_record
+            if record is not None:
+                record.mark("acquired")
             
-            if self.last_frame is not None:
-                try:
-                    cv2.imwrite(filename, self.last_frame)
-                    self.log_signal.emit(f"📸 Captured image from {self.camera_name}: {filename}")
-                    self.trigger_completed_signal.emit(filename, self.camera_name)
-                except Exception as e:
-                    self.log_signal.emit(f"❌ Error saving image: {str(e)}")
-                    self.trigger_completed_signal.emit("error", self.camera_name)
+            # Prefer the original JPEG when it is at least as new as the decoded frame
+            jpeg = None
+            if self.encoded_frame is not None and self.encoded_frame[1] >= captured_at:
+                jpeg, captured_at = self.encoded_frame
+            
+            if jpeg is not None or frame is not None:
+                # Passthrough JPEGs are written as-is, raw frames are encoded by the writer
+                source = "passthrough" if jpeg is not None else "encoded"
+                metadata = None
+                if self.capture_sidecar:
+                    metadata = self._capture_metadata(captured_at, sequence, source, frame)
+                # Handed off to the shared writer pool; drops are reported through the callback
+                jobs.append(CaptureJob(
+                    filename,
+                    frame=None if jpeg is not None else frame,
+                    jpeg=jpeg,
+                    metadata=metadata,
+                    callback=lambda job, error, age=time.time() - captured_at, source=source:
+                        self._handle_capture_written(job, error, f"frame age {age * 1000:.0f} ms, {source}"),
+                    record=record,
+                ))
             else:
                 self.log_signal.emit(f"❌ No frame available to capture")
                 self.trigger_completed_signal.emit("error", self.camera_name)
@@ -250,24 +525,123 @@ class CameraThread(QThread):
             # Handle other actions here
             self.log_signal.emit(f"⚠️ Unknown action: {self.trigger_action}")
             self.trigger_completed_signal.emit("error", self.camera_name)
+    
+    def _process_history_requests(self, jobs):
+        """Queue history windows that are complete or timed out (mutex held; captures are appended to ``jobs``)."""
+        now = time.time()
+        remaining = []
+        for request in self.history_requests:
+            entries, complete = self.history.window(request["timestamp"], request["before"], request["after"])
+            if not complete and now < request["deadline"]:
+                remaining.append(request)
+                continue
+            
+            if not entries:
+                self.log_signal.emit(f"❌ No history frames available for {self.camera_name}")
+                self.trigger_completed_signal.emit("error", self.camera_name)
+                continue
+            
+            # The frame closest to the event carries the trigger's timing
+            request["record"].mark("acquired")
+            closest = min(entries, key=lambda entry: abs(entry.timestamp - request["timestamp"]))
+            for entry in entries:
+                stamp = datetime.fromtimestamp(entry.timestamp).strftime("%Y%m%d_%H%M%S_%f")[:-3]
+                filename = f"{self.save_path}/{self.camera_name}_{stamp}.jpg"
+                offset_ms = (entry.timestamp - request["timestamp"]) * 1000
+                metadata = None
+                if self.capture_sidecar:
+                    metadata = self._capture_metadata(entry.timestamp, entry.sequence, "history", None)
+                    metadata["trigger_timestamp"] = request["timestamp"]
+                jobs.append(CaptureJob(
+                    filename,
+                    jpeg=entry.jpeg,
+                    metadata=metadata,
+                    callback=lambda job, error, offset=offset_ms:
+                        self._handle_capture_written(job, error, f"{offset:+.0f} ms from trigger"),
+                    record=request["record"] if entry is closest else None,
+                ))
+        self.history_requests = remaining
+    
+    def _handle_capture_written(self, job, error, details=None):
+        """Report a finished capture (runs on a writer thread)."""
+        if error:
+            self.log_signal.emit(f"❌ Error saving image: {error}")
+            self.trigger_completed_signal.emit("error", self.camera_name)
+            return
+        suffix = f" ({details})" if details else ""
+        self.log_signal.emit(f"📸 Captured image from {self.camera_name}: {job.filename}{suffix}")
+        self.trigger_completed_signal.emit(job.filename, self.camera_name)
+        if job.record is not None:
+            # The UI marks the notification stage when it receives this
+            self.trigger_timing_signal.emit(job.record, self.camera_name)
+            
+    def _capture_metadata(self, captured_at, sequence, source, frame):
+        """Build the .json sidecar content for a capture."""
+        metadata = {
+            "camera_name": self.camera_name,
+            "ip_address": self.ip,
+            "protocol": self.protocol,
+            "captured_at": captured_at,
+            "captured_at_iso": datetime.fromtimestamp(captured_at).isoformat(timespec="milliseconds"),
+            "sequence": sequence or None,  # Ring buffer sequence (None if never decoded)
+            "source": source,
+        }
+        if frame is not None:
+            metadata["height"], metadata["width"] = frame.shape[:2]
+        return metadata
             
     def _process_ai(self):
-        """Process the triggered action on the current frame."""
-        # Save the current frame to file
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename = f"{self.result_path}/{self.camera_name}_{timestamp}.jpg"
+        """Send the current frame to the shared inference service."""
+        # Pulled frame is a private copy, so drawing on it later is safe
+        frame, _, _ = self.get_latest_frame()
+        record = self.ai_record
+        if record is not None:
+            record.mark("acquired")
         
-        if self.last_frame is not None:
-            try:
-                print(type(self.last_frame))
-                cv2.line(self.last_frame,(0,0),(511,511),(255,0,0),5)
-                cv2.imwrite(filename, self.last_frame)
-                self.log_signal.emit(f"📸 Captured image from {self.camera_name}: {filename}")
-                self.trigger_completed_signal.emit(filename, self.camera_name)
-            except Exception as e:
-                self.log_signal.emit(f"❌ Error saving image: {str(e)}")
-                self.trigger_completed_signal.emit("error", self.camera_name)
-        else:
+        if frame is None:
             self.log_signal.emit(f"❌ No frame available to capture")
             self.trigger_completed_signal.emit("error", self.camera_name)
-        
\ No newline at end of file
+            return
+        
+        service = get_inference_service()
+        if not service.submit(self.camera_name, frame, self._handle_detections, record, self.rois):
+            self.log_signal.emit(f"❌ Inference queue full, dropped AI trigger for {self.camera_name}")
+            self.trigger_completed_signal.emit("error", self.camera_name)
+        elif not service.ready:
+            self.log_signal.emit(f"⏳ AI trigger for {self.camera_name} queued until the model is ready ({service.status_message})")
+    
+    def _handle_detections(self, request, detections, error):
+        """Save the annotated frame and its detections (runs on the inference thread)."""
+        if error:
+            self.log_signal.emit(f"❌ Inference failed for {self.camera_name}: {error}")
+            self.trigger_completed_signal.emit("error", self.camera_name)
+            return
+        
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename = f"{self.result_path}/{self.camera_name}_{timestamp}.jpg"
+        result = AIResult(self.camera_name, request, detections, filename)
+        
+        self.log_signal.emit(
+            f"🧠 {self.camera_name}: detected {detections.describe()} "
+            f"({result.inference_ms:.0f} ms, batch of {result.batch_size})"
+        )
+        
+        self.capture_writer.submit(CaptureJob(
+            filename,
+            frame=self._draw_rois(detections.draw(request.frame, copy=False)),  # Already a private copy
+            metadata=result.to_dict(),
+            callback=lambda job, error, result=result: self._handle_ai_written(job, error, result),
+            record=request.record,
+        ))
+    
+    def _draw_rois(self, frame):
+        """Outline the regions that were searched."""
+        for x1, y1, x2, y2 in roi_boxes(self.rois or [], frame.shape):
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 128, 0), 1)
+        return frame
+    
+    def _handle_ai_written(self, job, error, result):
+        """Publish the structured result once its annotated image is on disk."""
+        if not error:
+            self.detection_signal.emit(result, self.camera_name)
+        self._handle_capture_written(job, error)
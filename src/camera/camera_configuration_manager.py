@@ -1,6 +1,29 @@
 import json
 import os
 
+# Stream endpoint per protocol: connected to by the camera threads and probed by the health checks
+STREAM_PATHS = {"RTSP": "/stream1", "HTTP": "/video"}
+
+# Per-camera settings filled in for entries that don't define them
+CAMERA_DEFAULTS = {
+    "target_fps": 30,  # Maximum rate frames are taken from the stream
+    "pacing": "latest",  # "latest" drains stale frames, "sequential" reads every frame
+    "decode_mode": "always",  # "on_demand" only grabs RTSP/local frames until pixels are needed
+    "capture_backend": "thread",  # "thread" decodes in-process, "process" in a worker process,
+                                  # "snapshot" keeps no stream and fetches a still image per trigger
+    "capture_sidecar": False,  # Write a .json metadata file next to each captured image
+    "history_seconds": 0,  # Pre-trigger history kept in memory (0 = disabled)
+    "history_fps": 10,  # Rate frames are added to the history
+    "auto_connect": True,  # Connect at startup
+    "auto_reconnect": True,  # Reconnect with exponential backoff when the stream drops
+    "reconnect_max_delay": 30,  # Longest wait between reconnect attempts (seconds)
+    "stall_timeout": 5,  # Seconds without frames before the watchdog forces a reconnect
+    "min_fps": 0,  # Expected minimum frame rate; sustained lower rates force a reconnect (0 = off)
+    "snapshot_path": "/shot.jpg",  # Still image URL path used by the snapshot backend
+    "snapshot_budget_ms": 500,  # Snapshots slower than this are logged
+    "rois": [],  # AI regions of interest as [x1, y1, x2, y2] in 0-1 frame coordinates ([] = whole frame)
+}
+
 class CameraConfigManager:
     """Manages saving and loading camera configurations"""
     
@@ -15,11 +38,20 @@ class CameraConfigManager:
             try:
                 with open(self.config_file, 'r') as f:
                     self.cameras = json.load(f)
+                for camera in self.cameras:
+                    self.apply_defaults(camera)
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Error loading config: {e}")
                 self.cameras = []
                 
         return self.cameras
+    
+    @staticmethod
+    def apply_defaults(camera_info):
+        """Fill in missing per-camera settings with their defaults"""
+        for key, value in CAMERA_DEFAULTS.items():
+            camera_info.setdefault(key, list(value) if isinstance(value, list) else value)
+        return camera_info
         
     def save_config(self):
         """Save camera configurations to file"""
@@ -35,6 +67,7 @@ class CameraConfigManager:
         """Add or update a camera in the configuration"""
         # Load latest configuration to avoid overwriting other changes
         self.load_config()
+        self.apply_defaults(camera_info)
         
         # Check if camera with same IP already exists
         for i, camera in enumerate(self.cameras):
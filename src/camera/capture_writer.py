@@ -0,0 +1,183 @@
+import json
+import os
+import queue
+import threading
+import cv2
+
+# What submit() does when the queue is full
+POLICY_BLOCK = "block"  # Wait up to block_timeout for room, then drop the new capture
+POLICY_DROP_NEWEST = "drop"  # Reject the new capture immediately
+POLICY_DROP_OLDEST = "drop_oldest"  # Evict the oldest queued capture to make room
+
+WRITER_CONFIG_FILE = "src/asset/capture_writer_config.json"
+
+WRITER_DEFAULTS = {
+    "workers": 2,
+    "max_queue": 64,
+    "policy": POLICY_DROP_NEWEST,  # "block" holds up the submitting camera thread while the disk catches up
+    "block_timeout": 0.5,
+}
+
+
+def load_writer_settings(config_file=WRITER_CONFIG_FILE):
+    """Read the capture writer settings file, falling back to WRITER_DEFAULTS for missing keys."""
+    settings = dict(WRITER_DEFAULTS)
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, "r", encoding="utf-8") as f:
+                settings.update(json.load(f))
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"⚠️ Could not read {config_file}, using default writer settings: {str(e)}")
+    return settings
+
+
+class CaptureJob:
+    """One image to write: either an already-encoded JPEG or a raw BGR frame."""
+
+    def __init__(self, filename, frame=None, jpeg=None, metadata=None, callback=None, record=None):
+        self.filename = filename
+        self.frame = frame
+        self.jpeg = jpeg
+        self.metadata = metadata  # Written as a .json sidecar when set
+        self.callback = callback  # callback(job, error) with error=None on success
+        self.record = record  # Optional TriggerRecord timed through the writer stages
+
+    def mark(self, stage):
+        if self.record is not None:
+            self.record.mark(stage)
+
+
+class CaptureWriterPool:
+    """Background threads that encode and write captures off the capture loop."""
+
+    def __init__(self, workers=2, max_queue=64, policy=POLICY_DROP_NEWEST, block_timeout=0.5):
+        if policy not in (POLICY_BLOCK, POLICY_DROP_NEWEST, POLICY_DROP_OLDEST):
+            raise ValueError(f"Unknown writer policy: {policy}")
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.jobs = queue.Queue(maxsize=max_queue)
+
+        # Counters
+        self.lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self.threads = []
+        for index in range(workers):
+            thread = threading.Thread(target=self._work, name=f"capture-writer-{index}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, job):
+        """
+        Queue a capture for writing.
+
+        Returns:
+            bool: False if the capture was dropped because the disk can't keep up
+        """
+        try:
+            if self.policy == POLICY_BLOCK:
+                self.jobs.put(job, timeout=self.block_timeout)
+            elif self.policy == POLICY_DROP_OLDEST:
+                while True:
+                    try:
+                        self.jobs.put_nowait(job)
+                        break
+                    except queue.Full:
+                        try:
+                            self._drop(self.jobs.get_nowait())
+                            self.jobs.task_done()
+                        except queue.Empty:
+                            pass
+            else:
+                self.jobs.put_nowait(job)
+            return True
+        except queue.Full:
+            self._drop(job)
+            return False
+
+    def queue_depth(self):
+        """Number of captures waiting to be written."""
+        return self.jobs.qsize()
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "queued": self.queue_depth(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+            }
+
+    def flush(self):
+        """Block until every queued capture has been written."""
+        self.jobs.join()
+
+    def _drop(self, job):
+        with self.lock:
+            self.dropped += 1
+        self._notify(job, "dropped (writer queue full)")
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            job.mark("dequeued")
+            try:
+                self._write(job)
+                with self.lock:
+                    self.written += 1
+                self._notify(job, None)
+            except Exception as e:
+                with self.lock:
+                    self.failed += 1
+                self._notify(job, str(e))
+            finally:
+                self.jobs.task_done()
+
+    def _write(self, job):
+        """Encode (if needed) and write one capture plus its sidecar."""
+        os.makedirs(os.path.dirname(job.filename) or ".", exist_ok=True)
+        if job.jpeg is not None:
+            data = job.jpeg
+        else:
+            ok, encoded = cv2.imencode(os.path.splitext(job.filename)[1] or ".jpg", job.frame)
+            if not ok:
+                raise IOError(f"Could not encode {job.filename}")
+            data = encoded.tobytes()
+        job.mark("encoded")
+
+        with open(job.filename, "wb") as f:
+            f.write(data)
+        job.mark("written")
+
+        if job.metadata is not None:
+            with open(os.path.splitext(job.filename)[0] + ".json", "w") as f:
+                json.dump(job.metadata, f, indent=4)
+
+    @staticmethod
+    def _notify(job, error):
+        if job.callback is None:
+            return
+        try:
+            job.callback(job, error)
+        except Exception as e:
+            print(f"⚠️ Capture callback failed for {job.filename}: {str(e)}")
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_capture_writer(**settings):
+    """
+    Return the process-wide writer pool, creating it on first use.
+
+    Settings (see WRITER_DEFAULTS) only take effect on the first call; the UI
+    creates the pool with the settings file before any camera starts.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = CaptureWriterPool(**{**WRITER_DEFAULTS, **settings})
+        return _writer
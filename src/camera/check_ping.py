@@ -1,35 +1,145 @@
-import subprocess
-import sys
+import asyncio
+import time
 from PySide6.QtCore import QThread, Signal
+from camera.camera_configuration_manager import STREAM_PATHS
+
+# Default ports when a camera's port is missing
+DEFAULT_PORTS = {"RTSP": 554, "HTTP": 80}
+
+
+class ProbeTarget:
+    """
+    One address to probe; ``key`` identifies it in the results (defaults to the IP).
+
+    ``path`` defaults to the protocol's stream endpoint, so a camera serving its
+    landing page with a broken stream isn't reported as reachable.
+    """
+
+    __slots__ = ("key", "ip", "port", "protocol", "path")
+
+    def __init__(self, ip, port=None, protocol="HTTP", key=None, path=None):
+        self.key = key or ip
+        self.ip = ip
+        self.port = int(port) if str(port).strip().isdigit() else DEFAULT_PORTS.get(protocol, 80)
+        self.protocol = protocol
+        self.path = path or STREAM_PATHS.get(protocol, "/")
+
+
+class ProbeResult:
+    """Outcome of probing one target."""
+
+    __slots__ = ("key", "ip", "port", "reachable", "rtt_ms", "message")
+
+    def __init__(self, target, reachable, rtt_ms, message):
+        self.key = target.key
+        self.ip = target.ip
+        self.port = target.port
+        self.reachable = reachable
+        self.rtt_ms = rtt_ms  # TCP connect time, None when unreachable
+        self.message = message
+
+
+async def probe_target(target, timeout=1.0, check_stream=True):
+    """
+    Check reachability with a non-blocking TCP connect to the camera's port, then
+    (unless ``check_stream`` is False) a request for its stream endpoint.
+
+    Args:
+        target (ProbeTarget): Address to check
+        timeout (float): Limit for the connect (and the stream request)
+        check_stream (bool): Also send an HTTP GET / RTSP OPTIONS for the stream endpoint and
+            expect a status line (False only checks that the port accepts connections)
+
+    Returns:
+        ProbeResult
+    """
+    start = time.perf_counter()
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(target.ip, target.port), timeout)
+        rtt_ms = (time.perf_counter() - start) * 1000
+        message = f"TCP {target.port} open ({rtt_ms:.1f} ms)"
+
+        if check_stream:
+            if target.protocol == "RTSP":
+                request = f"OPTIONS rtsp://{target.ip}:{target.port}{target.path} RTSP/1.0\r\nCSeq: 1\r\n\r\n"
+            else:
+                request = f"GET {target.path} HTTP/1.0\r\nHost: {target.ip}:{target.port}\r\n\r\n"
+            writer.write(request.encode())
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), timeout)
+            if not status_line.startswith((b"HTTP/", b"RTSP/")):
+                return ProbeResult(target, False, rtt_ms, f"Port open but no {target.protocol} response")
+            status = status_line.decode("latin-1").strip()
+            message += f", {status}"
+            # Auth challenges still prove the stream is served; a missing endpoint or server error doesn't
+            parts = status.split()
+            code = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+            if code >= 400 and code not in (401, 403):
+                return ProbeResult(target, False, rtt_ms, f"{message} on {target.path}")
+
+        return ProbeResult(target, True, rtt_ms, message)
+    except asyncio.TimeoutError:
+        return ProbeResult(target, False, None, f"Timed out after {timeout:.1f}s")
+    except OSError as e:
+        return ProbeResult(target, False, None, e.strerror or str(e))
+    except Exception as e:
+        return ProbeResult(target, False, None, f"Error: {str(e)}")
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def probe_all(targets, timeout=1.0, check_stream=True, concurrency=256, on_result=None):
+    """
+    Probe many targets concurrently from one event loop.
+
+    Args:
+        concurrency (int): Maximum sockets open at once (keeps below the fd limit)
+        on_result (callable): Called with each ProbeResult as soon as it is known
+
+    Returns:
+        list: ProbeResult for every target, in the order given
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(target):
+        async with semaphore:
+            result = await probe_target(target, timeout, check_stream)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    return await asyncio.gather(*(run(target) for target in targets))
+
 
 class PingThread(QThread):
-    result_signal = Signal(str, bool, str)  # Signal to send (IP, is_reachable, message)
+    """Probes one or many cameras in the background (TCP connect + stream request, no ping subprocess)."""
 
-    def __init__(self, ip):
+    result_signal = Signal(str, bool, str)  # Signal to send (key, is_reachable, message)
+    rtt_signal = Signal(str, object)  # Signal to send (key, rtt_ms or None)
+    batch_signal = Signal(list)  # All ProbeResults once every target has answered
+
+    def __init__(self, targets, timeout=1.0, check_stream=True, concurrency=256):
+        """
+        Args:
+            targets: An IP string, a ProbeTarget, or a list of ProbeTargets
+        """
         super().__init__()
-        self.ip = ip
+        if isinstance(targets, (str, ProbeTarget)):
+            targets = [targets]
+        self.targets = [t if isinstance(t, ProbeTarget) else ProbeTarget(t) for t in targets]
+        self.timeout = timeout
+        self.check_stream = check_stream
+        self.concurrency = concurrency
 
     def run(self):
-        try: 
-            # Use `-n 1` for Windows, `-c 1` for Linux/macOS, add timeout
-            if sys.platform == "win32":
-                command = ["ping", "-n", "1", "-w", "1000", self.ip]  # 1 second timeout on Windows
-           
-            # Run the ping command
-            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=2)
-            
-            # Check if ping was successful
-            is_reachable = result.returncode == 0
-            
-            # Get the ping output for debugging
-            output = result.stdout
-            
-        except subprocess.TimeoutExpired:
-            is_reachable = False
-            output = "Ping process timed out"
-        except Exception as e:
-            is_reachable = False
-            output = f"Error: {str(e)}"
-        
+        results = asyncio.run(probe_all(
+            self.targets, self.timeout, self.check_stream, self.concurrency, self._emit_result
+        ))
+        self.batch_signal.emit(results)
+
+    def _emit_result(self, result):
         # Send back the result and debug info
-        self.result_signal.emit(self.ip, is_reachable, output)
\ No newline at end of file
+        self.result_signal.emit(result.key, result.reachable, result.message)
+        self.rtt_signal.emit(result.key, result.rtt_ms)
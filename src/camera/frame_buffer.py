@@ -0,0 +1,100 @@
+import threading
+import numpy as np
+
+
+class FrameRingBuffer:
+    """Preallocated ring buffer holding the most recent raw BGR frames of one camera."""
+
+    def __init__(self, slots=4):
+        """Create an empty buffer; slot memory is allocated on the first frame."""
+        if slots < 2:
+            raise ValueError("FrameRingBuffer needs at least 2 slots")
+        self.slots = slots
+        self.lock = threading.Lock()
+
+        # Slot storage (allocated lazily once the frame shape is known)
+        self.frames = None
+        self.sequences = [0] * slots
+        self.timestamps = [0.0] * slots
+
+        # Index of the newest committed slot (-1 = nothing written yet)
+        self.latest_index = -1
+        self.sequence = 0
+
+    @property
+    def shape(self):
+        """Shape of the frames stored in the buffer, or None before the first frame."""
+        return None if self.frames is None else self.frames.shape[1:]
+
+    def _allocate(self, shape, dtype):
+        """(Re)allocate slot memory for frames of the given shape."""
+        self.frames = np.empty((self.slots,) + tuple(shape), dtype=dtype)
+        self.latest_index = -1
+
+    def write_slot(self):
+        """
+        Return the slot array the next frame should be decoded into.
+
+        The slot is never the one readers are copying from, so the capture thread
+        can hand it straight to ``cv2.VideoCapture.read`` without locking.
+        Returns None until the frame shape is known.
+        """
+        if self.frames is None:
+            return None
+        return self.frames[(self.latest_index + 1) % self.slots]
+
+    def commit(self, frame, timestamp):
+        """
+        Publish a frame as the newest entry.
+
+        If ``frame`` is the array returned by ``write_slot`` nothing is copied;
+        otherwise it is copied into the slot (reallocating only if the shape changed).
+        Returns the sequence number assigned to the frame.
+        """
+        with self.lock:
+            if self.frames is None or self.frames.shape[1:] != frame.shape or self.frames.dtype != frame.dtype:
+                self._allocate(frame.shape, frame.dtype)
+
+            index = (self.latest_index + 1) % self.slots
+            slot = self.frames[index]
+            if frame is not slot:
+                np.copyto(slot, frame)
+
+            self.sequence += 1
+            self.sequences[index] = self.sequence
+            self.timestamps[index] = timestamp
+            self.latest_index = index
+            return self.sequence
+
+    def latest(self, out=None):
+        """
+        Copy the newest frame out of the buffer.
+
+        Args:
+            out (np.ndarray): Optional destination array with the buffer's shape;
+                reusing it avoids an allocation per read.
+
+        Returns:
+            tuple: (frame, sequence, timestamp) or (None, 0, 0.0) if empty
+        """
+        with self.lock:
+            if self.latest_index < 0:
+                return None, 0, 0.0
+            slot = self.frames[self.latest_index]
+            if out is None or out.shape != slot.shape or out.dtype != slot.dtype:
+                out = slot.copy()
+            else:
+                np.copyto(out, slot)
+            return out, self.sequences[self.latest_index], self.timestamps[self.latest_index]
+
+    def latest_sequence(self):
+        """Return (sequence, timestamp) of the newest frame without copying pixels."""
+        with self.lock:
+            if self.latest_index < 0:
+                return 0, 0.0
+            return self.sequences[self.latest_index], self.timestamps[self.latest_index]
+
+    def clear(self):
+        """Forget all frames but keep the slot memory for reuse."""
+        with self.lock:
+            self.latest_index = -1
@@ -0,0 +1,96 @@
+import bisect
+import threading
+from collections import deque
+import cv2
+
+
+class HistoryEntry:
+    """One frame of history, kept compressed."""
+
+    __slots__ = ("timestamp", "sequence", "jpeg")
+
+    def __init__(self, timestamp, sequence, jpeg):
+        self.timestamp = timestamp
+        self.sequence = sequence
+        self.jpeg = jpeg
+
+
+class FrameHistory:
+    """Rolling window of the last few seconds of frames, stored as JPEG to keep memory low."""
+
+    def __init__(self, seconds=2.0, max_fps=10.0, quality=85):
+        """
+        Args:
+            seconds (float): How far back frames are retained
+            max_fps (float): Maximum rate frames are added (raw frames must be encoded)
+            quality (int): JPEG quality used when encoding raw frames
+        """
+        self.seconds = seconds
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        self.lock = threading.Lock()
+        self.entries = deque()
+        self.last_added = 0.0
+
+    def wants(self, timestamp):
+        """Check whether a frame captured at ``timestamp`` should be recorded."""
+        return timestamp - self.last_added >= self.min_interval * 0.9
+
+    def add_jpeg(self, jpeg, timestamp, sequence=0):
+        """Record an already-compressed frame (no encoding cost)."""
+        with self.lock:
+            self.entries.append(HistoryEntry(timestamp, sequence, jpeg))
+            self.last_added = timestamp
+            self._prune(timestamp)
+
+    def add_frame(self, frame, timestamp, sequence=0):
+        """Encode and record a raw BGR frame."""
+        ok, encoded = cv2.imencode(".jpg", frame, self.encode_params)
+        if ok:
+            self.add_jpeg(encoded.tobytes(), timestamp, sequence)
+
+    def _prune(self, now):
+        while self.entries and now - self.entries[0].timestamp > self.seconds:
+            self.entries.popleft()
+
+    def newest_timestamp(self):
+        with self.lock:
+            return self.entries[-1].timestamp if self.entries else 0.0
+
+    def closest(self, timestamp):
+        """Return the entry captured closest to ``timestamp`` (or None if empty)."""
+        with self.lock:
+            if not self.entries:
+                return None
+            times = [entry.timestamp for entry in self.entries]
+            index = bisect.bisect_left(times, timestamp)
+            candidates = [i for i in (index - 1, index) if 0 <= i < len(times)]
+            best = min(candidates, key=lambda i: abs(times[i] - timestamp))
+            return self.entries[best]
+
+    def window(self, timestamp, before, after):
+        """
+        Return up to ``before`` entries captured before ``timestamp``, the closest entry,
+        and up to ``after`` entries following it.
+
+        Returns:
+            tuple: (entries, complete) where complete is False while frames after
+            ``timestamp`` are still missing
+        """
+        with self.lock:
+            if not self.entries:
+                return [], False
+            entries = list(self.entries)
+        times = [entry.timestamp for entry in entries]
+        index = bisect.bisect_left(times, timestamp)
+        candidates = [i for i in (index - 1, index) if 0 <= i < len(times)]
+        center = min(candidates, key=lambda i: abs(times[i] - timestamp))
+
+        selected = entries[max(0, center - before):center + after + 1]
+        complete = center + after < len(entries) and times[-1] >= timestamp
+        return selected, complete
+
+    def memory_usage(self):
+        """Approximate bytes held by the history."""
+        with self.lock:
+            return sum(len(entry.jpeg) for entry in self.entries)
@@ -0,0 +1,109 @@
+import time
+
+# Pacing modes
+PACING_LATEST = "latest"  # Drain the backend buffer with grab() and retrieve only the newest frame
+PACING_SEQUENTIAL = "sequential"  # Plain read() of every frame in arrival order
+
+
+class FramePacer:
+    """Reads the freshest frame from a capture and paces the loop to a target fps."""
+
+    def __init__(self, target_fps=30.0, mode=PACING_LATEST, drain_threshold=0.005, max_drain=30):
+        """
+        Args:
+            target_fps (float): Maximum rate frames are taken from the camera (0 = as fast as possible)
+            mode (str): PACING_LATEST or PACING_SEQUENTIAL
+            drain_threshold (float): A grab() returning faster than this (seconds) came from the
+                backend buffer, so another one is attempted
+            max_drain (int): Upper bound on grabs per frame so a fast camera can't starve the loop
+        """
+        if mode not in (PACING_LATEST, PACING_SEQUENTIAL):
+            raise ValueError(f"Unknown pacing mode: {mode}")
+        self.mode = mode
+        self.frame_interval = 1.0 / target_fps if target_fps else 0.0
+        self.drain_threshold = drain_threshold
+        self.max_drain = max_drain
+
+        # Measurements
+        self.next_deadline = 0.0
+        self.last_timestamp = 0.0
+        self.average_interval = 0.0
+        self.fps = 0.0
+        self.drained_frames = 0  # Stale frames skipped since start
+
+    def read(self, cap, image=None):
+        """
+        Grab and decode one frame according to the pacing mode.
+
+        Args:
+            cap: cv2.VideoCapture-like object
+            image (np.ndarray): Optional destination array for the decoded frame
+
+        Returns:
+            tuple: (ret, frame, capture timestamp)
+        """
+        ret, timestamp = self.grab(cap)
+        if not ret:
+            return False, None, 0.0
+        ret, frame = cap.retrieve(image) if image is not None else cap.retrieve()
+        return ret, frame, timestamp if ret else 0.0
+
+    def grab(self, cap):
+        """
+        Advance to the frame that should be used next, without decoding it.
+
+        Returns:
+            tuple: (ret, capture timestamp)
+        """
+        if self.mode == PACING_SEQUENTIAL or getattr(cap, "latest_only", False):
+            # Readers that only keep the newest frame have no backlog to drain
+            ret = cap.grab()
+        else:
+            ret = self.drain(cap)
+        return ret, self._mark(ret)
+
+    def drain(self, cap):
+        """
+        Grab until the backend buffer is empty, without decoding.
+
+        A grab() that blocks longer than drain_threshold waited for a brand new
+        frame, which means everything older has been skipped.
+        Returns False if the stream failed.
+        """
+        grabs = 0
+        while grabs < self.max_drain:
+            start = time.perf_counter()
+            if not cap.grab():
+                return False
+            grabs += 1
+            if time.perf_counter() - start >= self.drain_threshold:
+                break
+        # Every grab before the last one was a stale frame that is never decoded
+        self.drained_frames += grabs - 1
+        return True
+
+    def _mark(self, ret):
+        """Record the capture time of a successfully read frame."""
+        if not ret:
+            return 0.0
+        now = time.time()
+        if self.last_timestamp:
+            interval = now - self.last_timestamp
+            # Average the interval (not the instant rate) so bursts don't spike the figure
+            self.average_interval = interval if not self.average_interval else self.average_interval * 0.9 + interval * 0.1
+            if self.average_interval > 0:
+                self.fps = 1.0 / self.average_interval
+        self.last_timestamp = now
+        return now
+
+    def wait(self):
+        """Sleep only for what is left of the current frame interval."""
+        if not self.frame_interval:
+            return
+        now = time.monotonic()
+        if self.next_deadline > now:
+            time.sleep(self.next_deadline - now)
+            self.next_deadline += self.frame_interval
+        else:
+            # Running late: restart the schedule instead of trying to catch up
+            self.next_deadline = now + self.frame_interval
@@ -0,0 +1,113 @@
+import threading
+import cv2
+
+# Supported pixel formats and the conversion applied to the raw BGR frame
+PIXEL_FORMATS = {
+    "BGR": None,
+    "RGB": cv2.COLOR_BGR2RGB,
+    "GRAY": cv2.COLOR_BGR2GRAY,
+}
+
+
+class FrameSubscription:
+    """A consumer's request for frames of one camera at a given size, format and rate."""
+
+    def __init__(self, consumer, callback, size=None, pixel_format="BGR", max_fps=30.0):
+        """
+        Args:
+            consumer (str): Name of the consumer (display, thumbnail, ai, recorder, ...)
+            callback (callable): Called as callback(frame, sequence, timestamp) on the capture thread
+            size (tuple): Optional (max_width, max_height) box; frames are shrunk to fit, never enlarged
+            pixel_format (str): One of PIXEL_FORMATS
+            max_fps (float): Maximum delivery rate; 0 or None means every frame
+        """
+        if pixel_format not in PIXEL_FORMATS:
+            raise ValueError(f"Unsupported pixel format: {pixel_format}")
+        self.consumer = consumer
+        self.callback = callback
+        self.size = tuple(size) if size else None
+        self.pixel_format = pixel_format
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.last_delivery = 0.0
+
+    def is_due(self, timestamp):
+        """Check whether a frame captured at ``timestamp`` should be delivered."""
+        # Small tolerance so a 30 fps consumer on a 30 fps camera isn't halved by jitter
+        return timestamp - self.last_delivery >= self.min_interval * 0.9
+
+    def target_size(self, width, height):
+        """Return the (width, height) frames are delivered at for a source of the given size."""
+        if not self.size:
+            return width, height
+        max_width, max_height = self.size
+        scale = min(max_width / width, max_height / height, 1.0)
+        return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+class SubscriptionRegistry:
+    """Tracks live subscribers of one camera and performs only the conversions they need."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = []
+
+    def subscribe(self, consumer, callback, size=None, pixel_format="BGR", max_fps=30.0):
+        """Register a consumer and return its subscription handle."""
+        subscription = FrameSubscription(consumer, callback, size, pixel_format, max_fps)
+        with self.lock:
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscription (handle or consumer name). Returns True if something was removed."""
+        with self.lock:
+            before = len(self.subscriptions)
+            self.subscriptions = [
+                s for s in self.subscriptions
+                if s is not subscription and s.consumer != subscription
+            ]
+            return len(self.subscriptions) != before
+
+    def has_subscribers(self):
+        """Return True if at least one consumer is subscribed."""
+        return bool(self.subscriptions)
+
+    def dispatch(self, frame, sequence, timestamp):
+        """
+        Deliver a raw BGR frame to every subscriber that is due.
+
+        Each (size, format) combination is converted at most once per frame and
+        shared between subscribers asking for the same thing.
+        """
+        with self.lock:
+            due = [s for s in self.subscriptions if s.is_due(timestamp)]
+        if not due:
+            return
+
+        height, width = frame.shape[:2]
+        converted = {}
+        for subscription in due:
+            target = subscription.target_size(width, height)
+            key = (target, subscription.pixel_format)
+            if key not in converted:
+                converted[key] = self._convert(frame, target, subscription.pixel_format)
+
+            subscription.last_delivery = timestamp
+            try:
+                subscription.callback(converted[key], sequence, timestamp)
+            except Exception as e:
+                print(f"⚠️ Frame subscriber '{subscription.consumer}' failed: {str(e)}")
+
+    def _convert(self, frame, target, pixel_format):
+        """Resize first (cheaper on fewer pixels), then convert colour."""
+        height, width = frame.shape[:2]
+        if target != (width, height):
+            output = cv2.resize(frame, target, interpolation=cv2.INTER_AREA)
+        else:
+            # The source slot is reused by the ring buffer, so subscribers get their own copy
+            output = frame if PIXEL_FORMATS[pixel_format] is not None else frame.copy()
+
+        code = PIXEL_FORMATS[pixel_format]
+        if code is not None:
+            output = cv2.cvtColor(output, code)
+        return output
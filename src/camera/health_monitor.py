@@ -0,0 +1,227 @@
+import asyncio
+import time
+from collections import deque
+from PySide6.QtCore import QObject, QThread, QTimer, QMutex, QWaitCondition, Signal
+from camera.check_ping import ProbeTarget, probe_all
+
+# Statuses set by the monitor (stream statuses come from the camera threads)
+HEALTH_REACHABLE = "reachable"
+HEALTH_UNREACHABLE = "unreachable"
+PROBE_STATUSES = (HEALTH_REACHABLE, HEALTH_UNREACHABLE)
+
+
+class CameraHealth:
+    """Rolling probe and stream statistics of one camera."""
+
+    def __init__(self, camera_name, window=20):
+        self.camera_name = camera_name
+        self.status = None
+        self.rtts = deque(maxlen=window)  # Successful probe RTTs (ms)
+        self.fps = deque(maxlen=window)  # Stream fps samples while connected
+        self.probes = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_checked = 0.0
+
+    def record_probe(self, result):
+        """Add a ProbeResult and return the resulting health status."""
+        self.probes += 1
+        self.last_checked = time.time()
+        if result.reachable:
+            self.rtts.append(result.rtt_ms)
+            self.consecutive_failures = 0
+            return HEALTH_REACHABLE
+        self.errors += 1
+        self.consecutive_failures += 1
+        self.last_error = result.message
+        return HEALTH_UNREACHABLE
+
+    def summary(self):
+        def average(values):
+            return round(sum(values) / len(values), 1) if values else None
+
+        return {
+            "status": self.status,
+            "rtt_ms": average(self.rtts),
+            "rtt_max_ms": round(max(self.rtts), 1) if self.rtts else None,
+            "fps": average(self.fps),
+            "probes": self.probes,
+            "errors": self.errors,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "last_checked": self.last_checked,
+        }
+
+
+class HealthMonitor(QThread):
+    """Probes every camera on a schedule from one event loop and reports what changed."""
+
+    status_batch_signal = Signal(dict)  # {camera_name: status} for cameras whose status changed
+    health_signal = Signal(dict)  # {camera_name: summary} after every sweep
+
+    def __init__(self, interval=10.0, timeout=1.0, concurrency=256, failures_before_down=2,
+                 stats_provider=None, check_stream=True):
+        """
+        Args:
+            interval (float): Seconds between sweeps
+            timeout (float): Connect timeout per probe
+            concurrency (int): Maximum probes in flight
+            failures_before_down (int): Consecutive failed probes before a camera is reported
+                unreachable (one lost SYN shouldn't flip the icon)
+            stats_provider (callable): Returns {camera_name: stats} of streaming cameras (fps)
+            check_stream (bool): Request the stream endpoint instead of only opening the port
+        """
+        super().__init__()
+        self.interval = interval
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.failures_before_down = failures_before_down
+        self.stats_provider = stats_provider
+        self.check_stream = check_stream
+
+        self.mutex = QMutex()
+        self.condition = QWaitCondition()  # Wakes the sleep between sweeps
+        self.active = False
+        self.targets = {}  # camera_name -> ProbeTarget
+        self.health = {}  # camera_name -> CameraHealth
+
+    def set_targets(self, camera_properties):
+        """Replace the probed cameras with the given {camera_name: properties}."""
+        targets = {
+            name: ProbeTarget(props["ip_address"], props["port"], props["protocol"], key=name)
+            for name, props in camera_properties.items()
+        }
+        self.mutex.lock()
+        self.targets = targets
+        self.mutex.unlock()
+
+    def probe_now(self):
+        """Start the next sweep immediately."""
+        self.condition.wakeAll()
+
+    def stop(self):
+        self.mutex.lock()
+        self.active = False
+        self.mutex.unlock()
+        self.condition.wakeAll()
+
+    def run(self):
+        self.active = True
+        loop = asyncio.new_event_loop()
+        try:
+            while self.active:
+                self._sweep(loop)
+
+                # Sleep until the next sweep, stop() or probe_now()
+                self.mutex.lock()
+                if self.active:
+                    self.condition.wait(self.mutex, int(self.interval * 1000))
+                self.mutex.unlock()
+        finally:
+            loop.close()
+
+    def _sweep(self, loop):
+        """Probe all targets once and emit the status changes."""
+        self.mutex.lock()
+        targets = dict(self.targets)
+        self.mutex.unlock()
+
+        # Forget removed cameras
+        for name in list(self.health):
+            if name not in targets:
+                del self.health[name]
+
+        results = loop.run_until_complete(
+            probe_all(list(targets.values()), self.timeout, self.check_stream, self.concurrency)
+        )
+        stream_stats = self._stream_stats()
+
+        changes = {}
+        for result in results:
+            health = self.health.setdefault(result.key, CameraHealth(result.key))
+            status = health.record_probe(result)
+            if status == HEALTH_UNREACHABLE and health.consecutive_failures < self.failures_before_down:
+                status = health.status or HEALTH_REACHABLE
+            if result.key in stream_stats:
+                health.fps.append(stream_stats[result.key].get("fps", 0.0))
+            if status != health.status:
+                health.status = status
+                changes[result.key] = status
+
+        if changes:
+            self.status_batch_signal.emit(changes)
+        self.health_signal.emit({name: health.summary() for name, health in self.health.items()})
+
+    def _stream_stats(self):
+        if self.stats_provider is None:
+            return {}
+        try:
+            return self.stats_provider()
+        except Exception:
+            return {}  # Camera threads can come and go while being read
+
+    def get_health(self, camera_name=None):
+        """Return the latest summary of one camera (or of all cameras)."""
+        if camera_name is not None:
+            health = self.health.get(camera_name)
+            return health.summary() if health else None
+        return {name: health.summary() for name, health in list(self.health.items())}
+
+
+class StatusCoalescer(QObject):
+    """
+    Collects camera status updates and releases them as one batch a few times per second.
+
+    Only the newest status per camera is kept, and cameras whose status did not
+    actually change since the last batch are left out. Probe statuses never
+    replace a stream status: they are ignored while the camera streams and
+    don't overwrite one still pending.
+    """
+
+    flushed = Signal(dict)  # {camera_name: status}
+
+    def __init__(self, interval_ms=250, parent=None, is_streaming=None):
+        """
+        Args:
+            is_streaming (callable): is_streaming(camera_name) -> True while the camera's
+                thread runs and reports its own connection status
+        """
+        super().__init__(parent)
+        self.is_streaming = is_streaming
+        self.pending = {}
+        self.applied = {}
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.flush)
+
+    def push(self, camera_name, status):
+        if status in PROBE_STATUSES:
+            pending = self.pending.get(camera_name)
+            if pending is not None and pending not in PROBE_STATUSES:
+                return  # A stream status is waiting for this batch
+            if self.is_streaming is not None and self.is_streaming(camera_name):
+                return
+        self.pending[camera_name] = status
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def push_many(self, statuses):
+        for camera_name, status in statuses.items():
+            self.push(camera_name, status)
+
+    def forget(self, camera_name):
+        """Drop any state of a removed camera."""
+        self.pending.pop(camera_name, None)
+        self.applied.pop(camera_name, None)
+
+    def flush(self):
+        deltas = {
+            name: status for name, status in self.pending.items()
+            if self.applied.get(name) != status
+        }
+        self.pending.clear()
+        if deltas:
+            self.applied.update(deltas)
+            self.flushed.emit(deltas)
@@ -0,0 +1,291 @@
+import asyncio
+import base64
+import threading
+import time
+from urllib.parse import urlsplit, unquote
+import numpy as np
+import cv2
+
+# JPEG start/end of image markers
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
+
+
+class MJPEGStream:
+    """Latest JPEG of one multipart stream, shared between the event loop and capture threads."""
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.condition = threading.Condition()
+        self.future = None  # concurrent.futures.Future of the reader coroutine
+
+        # Latest part (compressed, never decoded here)
+        self.jpeg = None
+        self.sequence = 0
+        self.timestamp = 0.0
+
+        # Connection state
+        self.connected = False
+        self.closed = False
+        self.error = None
+
+    def publish(self, jpeg):
+        """Replace the latest JPEG and wake up waiting readers."""
+        with self.condition:
+            self.jpeg = jpeg
+            self.sequence += 1
+            self.timestamp = time.time()
+            self.condition.notify_all()
+
+    def set_connected(self):
+        with self.condition:
+            self.connected = True
+            self.condition.notify_all()
+
+    def finish(self, error=None):
+        """Mark the stream as ended (optionally with the reason)."""
+        with self.condition:
+            self.closed = True
+            self.error = error
+            self.condition.notify_all()
+
+    def wait_connected(self, timeout):
+        """Block until the response headers were accepted or the stream ended."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.connected or self.closed, timeout)
+            return self.connected and not self.closed
+
+    def wait_newer(self, sequence, timeout):
+        """
+        Block until a part newer than ``sequence`` arrives.
+
+        Returns:
+            tuple: (jpeg, sequence, timestamp) or (None, sequence, 0.0) on timeout/end of stream
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence > sequence or self.closed, timeout)
+            if self.sequence > sequence:
+                return self.jpeg, self.sequence, self.timestamp
+            return None, sequence, 0.0
+
+
+class MJPEGStreamManager:
+    """Runs every MJPEG-over-HTTP connection on one asyncio event loop thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="mjpeg-client", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def open(self, url, timeout=5.0):
+        """Start reading ``url`` in the background and return its MJPEGStream."""
+        stream = MJPEGStream(url, timeout)
+        stream.future = asyncio.run_coroutine_threadsafe(self._read(stream), self.loop)
+        return stream
+
+    def close(self, stream):
+        """Stop reading a stream (safe to call from any thread)."""
+        if stream.future is not None:
+            stream.future.cancel()
+        stream.finish()
+
+    async def _read(self, stream):
+        """Reader coroutine: split multipart parts and publish the raw JPEG bytes."""
+        writer = None
+        try:
+            reader, writer = await self._request(stream)
+            delimiter = await self._read_headers(reader, stream)
+            stream.set_connected()
+
+            while True:
+                await asyncio.wait_for(reader.readuntil(delimiter), stream.timeout)
+                part_headers = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), stream.timeout)
+                length = self._content_length(part_headers)
+
+                if length is not None:
+                    jpeg = await asyncio.wait_for(reader.readexactly(length), stream.timeout)
+                else:
+                    # No Content-Length: end at the JPEG EOI marker rather than the next
+                    # delimiter, which would hold every part back by one frame
+                    data = await asyncio.wait_for(reader.readuntil(JPEG_EOI), stream.timeout)
+                    jpeg = data[data.find(JPEG_SOI):]
+
+                stream.publish(jpeg)
+        except asyncio.CancelledError:
+            stream.finish()
+            raise
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            stream.finish(f"Stream ended: {str(e)}")
+        except asyncio.TimeoutError:
+            stream.finish("Stream timed out")
+        except Exception as e:
+            stream.finish(str(e))
+        finally:
+            if writer is not None:
+                writer.close()
+
+    async def _request(self, stream):
+        """Open the connection and send the GET request."""
+        parts = urlsplit(stream.url)
+        host = parts.hostname
+        port = parts.port or 80
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+
+        # Large limit so parts without Content-Length can be read up to the EOI marker
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, limit=2 ** 23), stream.timeout
+        )
+
+        # HTTP/1.0 keeps servers from switching to chunked transfer encoding
+        request = [f"GET {path} HTTP/1.0", f"Host: {host}:{port}", "User-Agent: Qt6-GUI-Design"]
+        if parts.username:
+            credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+            request.append(f"Authorization: Basic {base64.b64encode(credentials.encode()).decode()}")
+        writer.write(("\r\n".join(request) + "\r\n\r\n").encode())
+        await writer.drain()
+        return reader, writer
+
+    async def _read_headers(self, reader, stream):
+        """Validate the response and return the multipart delimiter."""
+        header = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), stream.timeout)
+        status_line, *lines = header.decode("latin-1").split("\r\n")
+        status = status_line.split(" ", 2)
+        if len(status) < 2 or status[1] != "200":
+            raise ConnectionError(f"HTTP error: {status_line}")
+
+        content_type = ""
+        for line in lines:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-type":
+                content_type = value.strip()
+
+        boundary = None
+        for param in content_type.split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "boundary":
+                boundary = value.strip('"')
+        if not content_type.lower().startswith("multipart/") or not boundary:
+            raise ConnectionError(f"Not an MJPEG stream (Content-Type: {content_type})")
+
+        # Some cameras put the leading dashes in the header, some don't; match both
+        return b"--" + boundary.lstrip("-").encode("latin-1")
+
+    @staticmethod
+    def _content_length(part_headers):
+        for line in part_headers.decode("latin-1").split("\r\n"):
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                try:
+                    return int(value.strip())
+                except ValueError:
+                    return None
+        return None
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_mjpeg_manager():
+    """Return the process-wide MJPEG event loop, starting it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = MJPEGStreamManager()
+        return _manager
+
+
+class MJPEGCapture:
+    """
+    cv2.VideoCapture-compatible reader for MJPEG-over-HTTP cameras.
+
+    grab() only waits for the next compressed part; pixels are decoded in
+    retrieve(), so a camera nobody looks at costs almost nothing.
+    """
+
+    compressed = True  # Frames arrive encoded; retrieve() is where decoding happens
+    latest_only = True  # No backlog to drain: grab() always yields the newest part
+
+    def __init__(self, timeout=5.0, manager=None):
+        self.timeout = timeout
+        self.manager = manager or get_mjpeg_manager()
+        self.stream = None
+
+        # Part selected by the last grab()
+        self.jpeg = None
+        self.sequence = 0
+        self.timestamp = 0.0
+
+    def open(self, url):
+        """Connect to ``url`` and wait until the stream headers are accepted."""
+        self.release()
+        self.stream = self.manager.open(url, self.timeout)
+        return self.stream.wait_connected(self.timeout)
+
+    def isOpened(self):
+        return self.stream is not None and self.stream.connected and not self.stream.closed
+
+    def grab(self):
+        """Wait for a part newer than the last one grabbed (no decoding)."""
+        if self.stream is None:
+            return False
+        jpeg, sequence, timestamp = self.stream.wait_newer(self.sequence, self.timeout)
+        if jpeg is None:
+            return False
+        self.jpeg, self.sequence, self.timestamp = jpeg, sequence, timestamp
+        return True
+
+    def retrieve(self, image=None):
+        """
+        Decode the grabbed part to a BGR frame.
+
+        Like cv2.VideoCapture, the frame lands in ``image`` when its shape matches
+        (e.g. a ring buffer slot), otherwise a new array is returned.
+        """
+        if self.jpeg is None:
+            return False, None
+        # OpenCV's Python imdecode has no destination argument, so the decoded
+        # frame is moved into the caller's buffer here instead of by the caller
+        frame = cv2.imdecode(np.frombuffer(self.jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return False, None
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def latest_jpeg(self):
+        """Return the compressed bytes of the last grabbed part."""
+        return self.jpeg
+
+    def get(self, prop):
+        return 0.0
+
+    def set(self, prop, value):
+        # Capture properties (buffer size, timeouts...) don't apply to this reader
+        return False
+
+    def interrupt(self):
+        """End the stream from another thread so a blocked grab() returns immediately."""
+        stream = self.stream
+        if stream is not None:
+            self.manager.close(stream)
+
+    def release(self):
+        if self.stream is not None:
+            self.manager.close(self.stream)
+            self.stream = None
+        self.jpeg = None
+        self.sequence = 0
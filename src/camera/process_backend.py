@@ -0,0 +1,400 @@
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+import cv2
+
+from camera.cam_handler import CameraThread, open_capture
+from camera.frame_buffer import FrameRingBuffer
+from camera.frame_pacing import FramePacer
+
+# Header fields (float64) in front of the frame slots
+HEADER_LATEST = 0  # Index of the newest committed slot (-1 = empty)
+HEADER_FPS = 1  # Measured capture fps in the worker
+HEADER_DRAINED = 2  # Stale frames skipped by the worker's pacer
+HEADER_FIELDS = 3
+
+# Longest the relay thread blocks on the worker pipe before rechecking its stop flags
+RELAY_TIMEOUT = 0.1
+
+
+class SharedFrameRing:
+    """
+    Ring of raw frames in shared memory, written by one capture process and read by others.
+
+    Exposes the same write_slot/commit/latest API as FrameRingBuffer. Readers use a
+    per-slot sequence number as a seqlock, so no cross-process lock is needed. Within
+    a process, ``lock`` keeps readers on other threads off a segment being closed.
+    """
+
+    def __init__(self, shm, shape, slots, owner):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.owner = owner  # Only the creating process unlinks the segment
+        self.lock = threading.Lock()  # Held by readers and close(); views are None once closed
+
+        meta_count = HEADER_FIELDS + slots * 2
+        self.meta = np.ndarray((meta_count,), dtype=np.float64, buffer=shm.buf)
+        self.header = self.meta[:HEADER_FIELDS]
+        self.slot_meta = self.meta[HEADER_FIELDS:].reshape(slots, 2)  # (sequence, timestamp)
+        self.frames = np.ndarray(
+            (slots,) + self.shape, dtype=np.uint8, buffer=shm.buf, offset=meta_count * 8
+        )
+        self.sequence = 0
+
+    @classmethod
+    def create(cls, shape, slots=4):
+        """Allocate a new shared segment sized for frames of ``shape``."""
+        size = (HEADER_FIELDS + slots * 2) * 8 + slots * int(np.prod(shape))
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        ring = cls(shm, shape, slots, owner=True)
+        ring.meta[:] = 0
+        ring.header[HEADER_LATEST] = -1
+        return ring
+
+    @classmethod
+    def attach(cls, name, shape, slots=4):
+        """Attach to a segment created by another process."""
+        # Spawned workers share the parent's resource tracker, so attaching here
+        # doesn't add a second registration that could unlink the owner's segment
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, shape, slots, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write_slot(self):
+        """Invalidate and return the slot the next frame should be decoded into."""
+        index = (int(self.header[HEADER_LATEST]) + 1) % self.slots
+        self.slot_meta[index, 0] = 0  # Readers treat sequence 0 as "being written"
+        return self.frames[index]
+
+    def commit(self, frame, timestamp):
+        """Publish the frame written into (or copied to) the current write slot."""
+        index = (int(self.header[HEADER_LATEST]) + 1) % self.slots
+        slot = self.frames[index]
+        if frame is not slot:
+            self.slot_meta[index, 0] = 0
+            np.copyto(slot, frame)
+        self.sequence += 1
+        self.slot_meta[index, 1] = timestamp
+        self.slot_meta[index, 0] = self.sequence
+        self.header[HEADER_LATEST] = index
+        return self.sequence
+
+    def latest(self, out=None):
+        """
+        Copy the newest frame out of shared memory.
+
+        Returns:
+            tuple: (frame, sequence, timestamp) or (None, 0, 0.0) if nothing is available
+        """
+        with self.lock:
+            if self.header is None:
+                return None, 0, 0.0
+            return self._latest(out)
+
+    def _latest(self, out):
+        for _ in range(3):
+            index = int(self.header[HEADER_LATEST])
+            if index < 0:
+                break
+            sequence = self.slot_meta[index, 0]
+            timestamp = self.slot_meta[index, 1]
+            if not sequence:
+                continue
+            slot = self.frames[index]
+            if out is None or out.shape != slot.shape:
+                out = slot.copy()
+            else:
+                np.copyto(out, slot)
+            # The writer may have lapped us while copying; only accept an untouched slot
+            if self.slot_meta[index, 0] == sequence:
+                return out, int(sequence), float(timestamp)
+        return None, 0, 0.0
+
+    def latest_sequence(self):
+        """Return (sequence, timestamp) of the newest frame without copying pixels."""
+        with self.lock:
+            if self.header is None:
+                return 0, 0.0
+            index = int(self.header[HEADER_LATEST])
+            if index < 0:
+                return 0, 0.0
+            return int(self.slot_meta[index, 0]), float(self.slot_meta[index, 1])
+
+    def worker_stats(self):
+        """Return (fps, drained frames) reported by the worker, or None once closed."""
+        with self.lock:
+            if self.header is None:
+                return None
+            return float(self.header[HEADER_FPS]), int(self.header[HEADER_DRAINED])
+
+    def clear(self):
+        self.header[HEADER_LATEST] = -1
+
+    def close(self):
+        """Release the mapping (and the segment itself in the owning process)."""
+        # Drop numpy views first, otherwise the buffer can't be released
+        with self.lock:
+            self.meta = self.header = self.slot_meta = self.frames = None
+            self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def capture_worker(url, camera_name, target_fps, pacing, conn, slots=4, timeout=2, read_timeout=2):
+    """
+    Entry point of a capture process.
+
+    Decodes the stream into a SharedFrameRing and reports over ``conn``:
+    ("log", message), ("status", status), ("ring", name, shape, slots),
+    ("frame", sequence) after each committed frame.
+    Stops when "stop" is received or the stream is lost.
+    """
+    cap = cv2.VideoCapture()
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    pacer = FramePacer(target_fps, pacing)
+    ring = None
+
+    try:
+        # Open once and wait for the first frame
+        open_capture(cap, url, timeout, read_timeout)
+        deadline = time.time() + timeout
+        ret, frame = False, None
+        while time.time() < deadline and cap.isOpened():
+            if conn.poll() and conn.recv() == "stop":
+                return
+            ret, frame = cap.read()
+            if ret:
+                break
+            time.sleep(0.1)
+
+        if not ret:
+            conn.send(("log", f"❌ Failed to connect to {camera_name} (Timeout)"))
+            conn.send(("status", "disconnected"))
+            return
+
+        ring = SharedFrameRing.create(frame.shape, slots)
+        sequence = ring.commit(frame, time.time())
+        conn.send(("ring", ring.name, frame.shape, slots))
+        conn.send(("log", f"✅ Connected to {camera_name}"))
+        conn.send(("status", "connected"))
+        conn.send(("frame", sequence))
+
+        while True:
+            if conn.poll() and conn.recv() == "stop":
+                break
+
+            ret, frame, timestamp = pacer.read(cap, ring.write_slot())
+            if not ret:
+                # Try a couple more times before giving up
+                for _ in range(3):
+                    time.sleep(0.1)
+                    ret, frame, timestamp = pacer.read(cap)
+                    if ret:
+                        break
+                if not ret:
+                    conn.send(("log", f"🚫 Lost connection to {camera_name}"))
+                    conn.send(("status", "disconnected"))
+                    break
+
+            if frame.shape != ring.shape:
+                # Resolution changed mid-stream: publish a new segment
+                old_ring = ring
+                ring = SharedFrameRing.create(frame.shape, slots)
+                conn.send(("ring", ring.name, frame.shape, slots))
+                old_ring.close()
+
+            sequence = ring.commit(frame, timestamp)
+            ring.header[HEADER_FPS] = pacer.fps
+            ring.header[HEADER_DRAINED] = pacer.drained_frames
+            conn.send(("frame", sequence))
+            pacer.wait()
+    except (EOFError, BrokenPipeError):
+        pass  # Parent went away
+    except Exception as e:
+        try:
+            conn.send(("log", f"❌ Error in {camera_name}: {str(e)}"))
+        except (EOFError, BrokenPipeError):
+            pass
+    finally:
+        cap.release()
+        if ring is not None:
+            ring.close()
+        conn.close()
+
+
+class ProcessCameraThread(CameraThread):
+    """
+    CameraThread whose decoding runs in a separate process.
+
+    The thread itself only relays log/status messages from the worker and runs
+    subscriptions and triggers on frames read from shared memory, so it keeps
+    the exact signals and pull API of CameraThread while the GIL-heavy decode
+    work scales across cores.
+    """
+
+    # Spawn (not fork) so workers don't inherit the Qt state of the GUI process
+    mp_context = multiprocessing.get_context("spawn")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.process = None
+        self.local_frame = None  # Reused buffer for frames copied out for subscribers
+
+    def run(self):
+        """Start the capture process and relay its output until stopped."""
+        self.active = True
+        url = self._build_camera_url()
+
+        self.log_signal.emit(f"🔌 Connecting to {self.camera_name} at {self.ip}...")
+        self.connection_status_signal.emit("connecting", self.camera_name)
+
+        while self._is_active():
+            conn, child_conn = self.mp_context.Pipe()
+            frame_interval = self.pacer.frame_interval
+            self.process = self.mp_context.Process(
+                target=capture_worker,
+                args=(url, self.camera_name, 1.0 / frame_interval if frame_interval else 0,
+                      self.pacer.mode, child_conn, 4, self.connect_timeout, self.read_timeout),
+                daemon=True,
+            )
+            self.process.start()
+            child_conn.close()
+
+            try:
+                self._relay(conn)
+            except Exception as e:
+                self.log_signal.emit(f"❌ Error in {self.camera_name}: {str(e)}")
+            finally:
+                self._shutdown_worker(conn)
+
+            if not self.auto_reconnect or not self._is_active():
+                break
+
+            # Same backoff as the threaded backend; a fresh worker is spawned per attempt
+            delay = self.backoff.next_delay()
+            self.log_signal.emit(f"🔁 Reconnecting to {self.camera_name} in {delay:.1f}s (attempt {self.backoff.attempts})")
+            self.connection_status_signal.emit("reconnecting", self.camera_name)
+            self._wait(delay)
+
+        self.active = False
+
+    def _relay(self, conn):
+        """Forward worker messages and process new shared frames."""
+        last_sequence = 0
+        while self.active and not self.reconnect_requested:
+            # Block until the worker reports something; the timeout only rechecks the stop flags
+            if not conn.poll(RELAY_TIMEOUT):
+                if not self.process.is_alive():
+                    break
+                continue
+
+            # Handle everything queued meanwhile, so a backlog of frame notices costs one copy
+            new_frame = False
+            try:
+                while True:
+                    message = conn.recv()
+                    if message[0] == "frame":
+                        new_frame = True
+                    elif not self._handle_message(message):
+                        return
+                    if not conn.poll():
+                        break
+            except EOFError:
+                break
+            if not new_frame:
+                continue
+
+            sequence, timestamp = self.frame_buffer.latest_sequence()
+            if sequence and sequence != last_sequence:
+                last_sequence = sequence
+                # Only copy out of shared memory when something in this process needs pixels
+                wants_history = self.history is not None and self.history.wants(timestamp)
+                if self.subscriptions.has_subscribers() or wants_history:
+                    frame, sequence, timestamp = self.frame_buffer.latest(self.local_frame)
+                    if frame is not None:
+                        self.local_frame = frame
+                        self.subscriptions.dispatch(frame, sequence, timestamp)
+                        if wants_history:
+                            self.history.add_frame(frame, timestamp, sequence)
+                self._process_pending_triggers()
+
+    def _handle_message(self, message):
+        """Apply one worker message. Returns False when the stream has ended."""
+        kind = message[0]
+        if kind == "log":
+            self.log_signal.emit(message[1])
+        elif kind == "status":
+            self.connection_status_signal.emit(message[1], self.camera_name)
+            if message[1] == "connected":
+                self.backoff.reset()
+                self._mark_streaming(True)
+            elif message[1] == "disconnected":
+                return False
+        elif kind == "ring":
+            _, name, shape, slots = message
+            try:
+                shared_buffer = SharedFrameRing.attach(name, shape, slots)
+            except FileNotFoundError:
+                return True  # Already replaced by a newer segment
+            old_buffer = self.frame_buffer
+            self.frame_buffer = shared_buffer
+            if isinstance(old_buffer, SharedFrameRing):
+                old_buffer.close()
+        return True
+
+    def _shutdown_worker(self, conn):
+        """Ask the worker to stop, then release shared memory."""
+        if self.reconnect_requested:
+            self.connection_status_signal.emit("disconnected", self.camera_name)
+        self._mark_streaming(False)
+        try:
+            conn.send("stop")
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(2)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1)
+        conn.close()
+
+        shared_buffer = self.frame_buffer
+        if isinstance(shared_buffer, SharedFrameRing):
+            # Keep the last frame reachable through the pull API after shutdown
+            frame, _, timestamp = shared_buffer.latest()
+            self.frame_buffer = FrameRingBuffer()
+            if frame is not None:
+                self.frame_buffer.commit(frame, timestamp)
+            shared_buffer.close()
+
+    def last_frame_time(self):
+        """Capture time of the newest frame the worker published (0.0 if none)."""
+        buffer = self.frame_buffer
+        if isinstance(buffer, SharedFrameRing):
+            return buffer.latest_sequence()[1]  # 0.0 once the relay thread closed the segment
+        return 0.0
+
+    def get_frame_age(self):
+        """Return seconds since the newest published frame was captured (None if no frame yet)."""
+        buffer = self.frame_buffer
+        if isinstance(buffer, SharedFrameRing):
+            timestamp = self.last_frame_time()
+        else:
+            timestamp = buffer.latest_sequence()[1]  # Last frame kept after the worker stopped
+        return time.time() - timestamp if timestamp else None
+
+    def get_stats(self):
+        """Return live stream measurements reported by the worker process."""
+        stats = super().get_stats()
+        buffer = self.frame_buffer
+        worker_stats = buffer.worker_stats() if isinstance(buffer, SharedFrameRing) else None
+        if worker_stats is not None:
+            fps, drained_frames = worker_stats
+            stats["fps"] = round(fps, 1)
+            stats["drained_frames"] = drained_frames
+        return stats
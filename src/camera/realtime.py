@@ -1,11 +1,19 @@
-import ultralytics
-from ultralytics import YOLO
+"""
+Standalone webcam detection demo.
+
+Run as a module from the src folder so the camera and model packages import:
+    python -m camera.realtime
+"""
 import time
 import cv2
 import threading
 import queue
-import numpy as np
 import os
+from model.backends import load_model
+from model.detections import Detections
+from model.inference_service import DEFAULT_MODEL_PATH, MODEL_LOADING, MODEL_READY, MODEL_FAILED, resolve_model_path
+from model.motion_gate import MotionGate
+from model.preprocess import LetterboxPreprocessor
 
 class WebcamVideoStream:
     def __init__(self, src=0):
@@ -29,17 +37,18 @@ class WebcamVideoStream:
         self.stream.release()
 
 class YOLODetector:
-    def __init__(self, model_path="yolov8s.pt"):
-        print("Khởi tạo model YOLO... (có thể mất vài giây)")
-        self.model = YOLO(model_path)
-        self.model.overrides['conf'] = 0.8
-        self.model.overrides['iou'] = 0.5
-        self.model.overrides['agnostic_nms'] = True
-        self.model.overrides['max_det'] = 1
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, motion_gate=None):
+        # Model is loaded by the detect thread, so the camera can start meanwhile
+        self.model_path = resolve_model_path(model_path)
+        self.model = None
+        self.status = MODEL_LOADING
+        self.status_message = "Waiting to load"
+        self.preprocessor = LetterboxPreprocessor(max_batch=1, rect=True)  # Webcam size is fixed
+        self.ready = threading.Event()
         
-        dummy_frame = np.zeros((640, 640, 3), dtype=np.uint8)
-        _ = self.model(dummy_frame)
-        print("Model YOLO đã sẵn sàng!")
+        # Frames without meaningful change reuse the last detections instead of running the model
+        self.motion_gate = motion_gate
+        self.last_detections = None
         
         self.processing_queue = queue.Queue(maxsize=1)
         self.results_queue = queue.Queue(maxsize=1)
@@ -50,28 +59,64 @@ class YOLODetector:
         threading.Thread(target=self.detect, args=(), daemon=True).start()
         return self
         
+    def _load_model(self):
+        """Load and warm up the model; returns False (status MODEL_FAILED) if it can't be loaded."""
+        print("Khởi tạo model YOLO... (có thể mất vài giây)")
+        overrides = {'conf': 0.8, 'iou': 0.5, 'agnostic_nms': True, 'max_det': 1}
+        try:
+            self.model = load_model(self.model_path, overrides=overrides,
+                                    progress=lambda message: self._set_status(MODEL_LOADING, message))
+        except Exception as e:
+            self._set_status(MODEL_FAILED, f"Could not load model {self.model_path}: {str(e)}")
+            print(f"❌ {self.status_message}")
+            return False
+        self._set_status(MODEL_READY, os.path.basename(self.model_path))
+        print("Model YOLO đã sẵn sàng!")
+        self.ready.set()
+        return True
+    
+    def _set_status(self, status, message):
+        self.status = status
+        self.status_message = message
+    
+    @property
+    def failed(self):
+        return self.status == MODEL_FAILED
+        
     def detect(self):
+        if not self._load_model():
+            return  # submit_frame() rejects frames from now on
         while not self.stopped:
             if not self.processing_queue.empty():
                 try:
                     frame = self.processing_queue.get(timeout=0.1)
-                    results = self.model(frame)
-                    annotated_frame = results[0].plot()
-                    
-                    with self.processing_lock:
-                        if not self.results_queue.empty():
-                            try:
-                                self.results_queue.get_nowait()
-                            except queue.Empty:
-                                pass
-                        self.results_queue.put(annotated_frame)
+                    inputs, transforms = self.preprocessor.prepare([frame])
+                    results = self.model(inputs, verbose=False)
+                    self.last_detections = Detections.from_result(results[0], transforms[0])
+                    self._publish(self.last_detections.draw(frame))
                 except Exception as e:
                     print(f"Lỗi trong quá trình detect: {e}")
                     time.sleep(0.01)
             else:
                 time.sleep(0.01)
     
-    def submit_frame(self, frame):
+    def _publish(self, annotated_frame):
+        with self.processing_lock:
+            if not self.results_queue.empty():
+                try:
+                    self.results_queue.get_nowait()
+                except queue.Empty:
+                    pass
+            self.results_queue.put(annotated_frame)
+    
+    def submit_frame(self, frame, force=False):
+        """Queue a frame for detection; unless ``force``, static frames reuse the last detections."""
+        if self.failed:
+            return False
+        if not force and self.motion_gate is not None and self.last_detections is not None \
+                and self.processing_queue.empty() and not self.motion_gate.check(frame):
+            self._publish(self.last_detections.draw(frame))
+            return True
         with self.processing_lock:
             if self.processing_queue.empty():
                 try:
@@ -97,7 +142,7 @@ class YOLODetector:
 def main():
     print("Khởi động chương trình...")
     
-    detector = YOLODetector().start()
+    detector = YOLODetector(motion_gate=MotionGate()).start()
     webcam = WebcamVideoStream(src=0).start()
     print("Camera đã sẵn sàng!")
     
@@ -136,6 +181,10 @@ def main():
                 display_frame = result_frame
 
             status = "Trạng thái: PLAY" if processing_active else "Trạng thái: STOP"
+            if detector.failed:
+                status += " (model lỗi)"
+            elif processing_active:
+                status += f" (bỏ qua {detector.motion_gate.get_stats()['skip_ratio']:.0%})"
             cv2.putText(display_frame, status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
 
             frame_time = time.time() - start_time
@@ -160,7 +209,7 @@ def main():
                 print("Chế độ: STOP")
             elif key == ord(' '):  # Nhấn SPACE để chụp và xử lý ngay lập tức
                 print("Chụp và xử lý ảnh...")
-                if detector.submit_frame(frame.copy()):
+                if detector.submit_frame(frame.copy(), force=True):
                     time.sleep(0.1)  # Chờ kết quả
                     has_result, processed_frame = detector.get_results()
                     if has_result:
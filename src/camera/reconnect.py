@@ -0,0 +1,37 @@
+import random
+
+
+class ReconnectBackoff:
+    """Jittered exponential backoff between reconnect attempts to one camera."""
+
+    def __init__(self, base_delay=1.0, max_delay=30.0, factor=2.0, jitter=0.3):
+        """
+        Args:
+            base_delay (float): Delay before the first retry (seconds)
+            max_delay (float): Upper bound for any delay
+            factor (float): Growth per failed attempt
+            jitter (float): Random +/- fraction so cameras behind one switch don't retry in lockstep
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+        self.attempts = 0
+        self.growth = 0  # Exponent of the next delay, frozen once it reaches max_delay
+
+    def next_delay(self):
+        """Return the delay before the next attempt and count the attempt."""
+        # Stop growing once the cap is reached; an unbounded exponent overflows for
+        # a camera that stays down long enough
+        delay = self.base_delay * self.factor ** self.growth
+        if delay < self.max_delay:
+            self.growth += 1
+        delay = min(self.max_delay, delay)
+        self.attempts += 1
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return min(self.max_delay, delay)
+
+    def reset(self):
+        """Call after a successful connection."""
+        self.attempts = 0
+        self.growth = 0
@@ -0,0 +1,32 @@
+import unittest
+
+from camera.reconnect import ReconnectBackoff
+
+
+class ReconnectBackoffTest(unittest.TestCase):
+
+    def test_delays_grow_exponentially_up_to_the_cap(self):
+        backoff = ReconnectBackoff(base_delay=1.0, max_delay=30.0, factor=2.0, jitter=0)
+        delays = [backoff.next_delay() for _ in range(8)]
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 8.0, 16.0, 30.0, 30.0, 30.0])
+
+    def test_camera_down_for_thousands_of_attempts(self):
+        # 2.0 ** 1024 overflows a float, so the exponent must stop growing at the cap
+        backoff = ReconnectBackoff(base_delay=1.0, max_delay=30.0, factor=2.0, jitter=0.3)
+        for _ in range(5000):
+            delay = backoff.next_delay()
+            self.assertLessEqual(delay, 30.0)
+        self.assertEqual(backoff.attempts, 5000)
+        self.assertGreaterEqual(delay, 30.0 * 0.7)
+
+    def test_reset_starts_over(self):
+        backoff = ReconnectBackoff(base_delay=1.0, max_delay=30.0, jitter=0)
+        for _ in range(2000):
+            backoff.next_delay()
+        backoff.reset()
+        self.assertEqual(backoff.attempts, 0)
+        self.assertEqual(backoff.next_delay(), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
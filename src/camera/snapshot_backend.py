@@ -0,0 +1,232 @@
+import base64
+import http.client
+import threading
+import time
+import numpy as np
+import cv2
+
+from camera.cam_handler import CameraThread
+
+
+class SnapshotConnectionPool:
+    """Keep-alive HTTP connections per camera host, reused across snapshot requests."""
+
+    def __init__(self, max_idle_per_host=2):
+        self.max_idle_per_host = max_idle_per_host
+        self.lock = threading.Lock()
+        self.idle = {}  # (host, port) -> [HTTPConnection]
+
+    def fetch(self, host, port, path, auth=None, timeout=5.0):
+        """
+        GET ``path`` and return the body.
+
+        A reused connection the camera has silently closed is retried once on a
+        fresh connection.
+
+        Returns:
+            tuple: (body bytes, reused connection)
+        """
+        key = (host, int(port))
+        conn = self._acquire(key)
+        reused = conn is not None
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection(host, int(port), timeout=timeout)
+            return self._request(conn, key, path, auth, timeout), reused
+        except (http.client.BadStatusLine, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+            # Stale keep-alive connection the camera closed: retry once on a new one
+            conn = http.client.HTTPConnection(host, int(port), timeout=timeout)
+            try:
+                return self._request(conn, key, path, auth, timeout), False
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            if conn is not None:
+                conn.close()
+            raise
+
+    def _request(self, conn, key, path, auth, timeout):
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        headers = {"Connection": "keep-alive", "User-Agent": "Qt6-GUI-Design"}
+        if auth:
+            headers["Authorization"] = f"Basic {base64.b64encode(auth.encode()).decode()}"
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        if response.status != 200:
+            conn.close()
+            raise ConnectionError(f"HTTP error: {response.status} {response.reason}")
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        return body
+
+    def _acquire(self, key):
+        with self.lock:
+            connections = self.idle.get(key)
+            return connections.pop() if connections else None
+
+    def _release(self, key, conn):
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if len(connections) < self.max_idle_per_host:
+                connections.append(conn)
+                return
+        conn.close()
+
+    def close_host(self, host, port):
+        """Close the idle connections to one camera."""
+        with self.lock:
+            connections = self.idle.pop((host, int(port)), [])
+        for conn in connections:
+            conn.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_snapshot_pool():
+    """Return the process-wide snapshot connection pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SnapshotConnectionPool()
+        return _pool
+
+
+class SnapshotCameraThread(CameraThread):
+    """
+    Camera without a video stream: a still image is fetched over HTTP only when triggered.
+
+    The thread sleeps between triggers, so an idle snapshot camera uses no CPU.
+    """
+
+    def __init__(self, *args, snapshot_path="/shot.jpg", snapshot_budget_ms=500, **kwargs):
+        # Pre-trigger history needs a continuous stream
+        kwargs["history_seconds"] = 0
+        super().__init__(*args, **kwargs)
+        self.snapshot_path = snapshot_path if snapshot_path.startswith("/") else f"/{snapshot_path}"
+        self.snapshot_budget_ms = snapshot_budget_ms
+        self.pool = get_snapshot_pool()
+
+        # Latency measurements
+        self.last_snapshot_ms = None
+        self.snapshots = 0
+        self.over_budget = 0
+        self.snapshot_failed = False  # Last triggered snapshot failed (shown as disconnected)
+
+    def run(self):
+        """Check the camera answers, then wait for triggers."""
+        self.active = True
+
+        self.log_signal.emit(f"🔌 Connecting to {self.camera_name} at {self.ip} (snapshot mode)...")
+        self.connection_status_signal.emit("connecting", self.camera_name)
+
+        # Same backoff as the streaming threads until the first snapshot succeeds
+        while self._is_active():
+            if self._fetch_snapshot(decode=False):
+                self.backoff.reset()
+                self.log_signal.emit(f"✅ Connected to {self.camera_name} ({self.last_snapshot_ms:.0f} ms per snapshot)")
+                self.connection_status_signal.emit("connected", self.camera_name)
+                break
+            self.connection_status_signal.emit("disconnected", self.camera_name)
+            if not self.auto_reconnect:
+                self.active = False
+                return
+            delay = self.backoff.next_delay()
+            self.log_signal.emit(f"🔁 Reconnecting to {self.camera_name} in {delay:.1f}s (attempt {self.backoff.attempts})")
+            self.connection_status_signal.emit("reconnecting", self.camera_name)
+            self._wait(delay)
+
+        while self._is_active():
+            # Sleep until trigger() or stop()
+            self.mutex.lock()
+            while self.active and not (self.triggered or self.triggered_ai):
+                self.condition.wait(self.mutex)
+            self.mutex.unlock()
+            if not self._is_active():
+                break
+
+            # Only AI needs pixels; captures are written as the camera's own JPEG
+            if self._fetch_snapshot(decode=self.triggered_ai):
+                if self.snapshot_failed:
+                    self.snapshot_failed = False
+                    self.connection_status_signal.emit("connected", self.camera_name)
+                self._process_pending_triggers(decoded=self.triggered_ai)
+            else:
+                self.snapshot_failed = True
+                self._fail_pending_triggers()
+
+        self.pool.close_host(self.ip, self.port)
+        self.active = False
+
+    def _fetch_snapshot(self, decode):
+        """Fetch one still image into encoded_frame (and frame_buffer when decoding)."""
+        auth = f"{self.username}:{self.password}" if self.username else None
+        start = time.perf_counter()
+        try:
+            jpeg, _ = self.pool.fetch(self.ip, self.port, self.snapshot_path, auth, self.connect_timeout)
+        except Exception as e:
+            self.log_signal.emit(f"❌ Snapshot from {self.camera_name} failed: {str(e)}")
+            return False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        captured_at = time.time()
+
+        self.last_snapshot_ms = elapsed_ms
+        self.snapshots += 1
+        if elapsed_ms > self.snapshot_budget_ms:
+            self.over_budget += 1
+            self.log_signal.emit(f"⏱️ Snapshot from {self.camera_name} took {elapsed_ms:.0f} ms (budget {self.snapshot_budget_ms} ms)")
+
+        self.encoded_frame = (jpeg, captured_at)
+        if decode:
+            frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                self.log_signal.emit(f"❌ Snapshot from {self.camera_name} is not a valid image")
+                return False
+            self.frame_buffer.commit(frame, captured_at)
+        return True
+
+    def _fail_pending_triggers(self):
+        """Report triggers that could not get a snapshot."""
+        self.mutex.lock()
+        failed = int(self.triggered) + int(self.triggered_ai)
+        self.triggered = False
+        self.triggered_ai = False
+        self.mutex.unlock()
+        for _ in range(failed):
+            self.trigger_completed_signal.emit("error", self.camera_name)
+        self.connection_status_signal.emit("disconnected", self.camera_name)
+
+    def trigger(self, action="capture"):
+        result = super().trigger(action)
+        self.condition.wakeAll()
+        return result
+
+    def trigger_and_process(self):
+        result = super().trigger_and_process()
+        self.condition.wakeAll()
+        return result
+
+    def last_frame_time(self):
+        """Fetch time of the newest snapshot (0.0 if none)."""
+        encoded_frame = self.encoded_frame
+        return encoded_frame[1] if encoded_frame is not None else 0.0
+
+    def get_stats(self):
+        """Return snapshot latency measurements for this camera."""
+        return {
+            "fps": 0.0,
+            "snapshot_ms": round(self.last_snapshot_ms, 1) if self.last_snapshot_ms is not None else None,
+            "snapshot_budget_ms": self.snapshot_budget_ms,
+            "snapshots": self.snapshots,
+            "over_budget": self.over_budget,
+        }
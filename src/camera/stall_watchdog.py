@@ -0,0 +1,162 @@
+import json
+import os
+import time
+from collections import deque
+from PySide6.QtCore import QObject, QTimer, Signal
+
+# Kinds of stall events
+STALL_NO_FRAMES = "stall"  # No frame for longer than stall_timeout
+STALL_FPS_COLLAPSE = "fps_collapse"  # Frames arrive, but below min_fps for longer than stall_timeout
+
+
+class StallEvent:
+    """One period in which a camera stopped delivering frames as expected."""
+
+    def __init__(self, camera_name, kind, started_at, details):
+        self.camera_name = camera_name
+        self.kind = kind
+        self.started_at = started_at
+        self.ended_at = None
+        self.details = details
+        self.forced_at = time.time()  # When the reconnect was forced
+        self.restarted = False  # Thread had to be replaced because it didn't react
+
+    @property
+    def duration(self):
+        return (self.ended_at or time.time()) - self.started_at
+
+    def to_dict(self):
+        return {
+            "camera_name": self.camera_name,
+            "kind": self.kind,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+            "duration": round(self.duration, 3),
+            "details": self.details,
+            "restarted": self.restarted,
+        }
+
+
+class WatchedCamera:
+    def __init__(self, thread, stall_timeout, min_fps):
+        self.thread = thread
+        self.stall_timeout = stall_timeout
+        self.min_fps = min_fps
+        self.slow_since = None  # First check that saw fps below min_fps
+        self.event = None  # Open StallEvent
+
+
+class StallWatchdog(QObject):
+    """
+    Checks the newest frame timestamp of every streaming camera and forces a
+    reconnect when a stream stalls or its frame rate collapses.
+
+    Runs on a timer in the owning (UI) thread; checks only read timestamps and
+    force_reconnect() never blocks, so one stuck camera can't hold up the others.
+    """
+
+    stall_signal = Signal(str, str, str)  # (camera_name, kind, details)
+    recovered_signal = Signal(str, float)  # (camera_name, stall duration in seconds)
+    restart_signal = Signal(str)  # Thread ignored the forced reconnect and should be replaced
+
+    def __init__(self, interval_ms=500, max_events=1000, parent=None):
+        super().__init__(parent)
+        self.cameras = {}  # camera_name -> WatchedCamera
+        self.events = deque(maxlen=max_events)  # Closed and open StallEvents, oldest first
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.check)
+        self.timer.start()
+
+    def watch(self, camera_name, thread, stall_timeout=5.0, min_fps=0.0):
+        """
+        Args:
+            stall_timeout (float): Seconds without a frame before the stream counts as stalled
+            min_fps (float): Expected minimum frame rate (0 disables the fps check)
+        """
+        self.cameras[camera_name] = WatchedCamera(thread, stall_timeout, min_fps)
+
+    def unwatch(self, camera_name):
+        watched = self.cameras.pop(camera_name, None)
+        if watched is not None and watched.event is not None:
+            self._close_event(camera_name, watched)
+
+    def check(self):
+        now = time.time()
+        for camera_name, watched in list(self.cameras.items()):
+            thread = watched.thread
+            if watched.event is not None:
+                self._check_recovery(camera_name, watched, now)
+                continue
+            if not thread.streaming:
+                watched.slow_since = None
+                continue
+
+            # Measure from the connect time too, so a previous connection's last frame doesn't count
+            last_frame = max(thread.last_frame_time(), thread.connected_at)
+            age = now - last_frame
+            if age > watched.stall_timeout:
+                self._open_event(camera_name, watched, STALL_NO_FRAMES, last_frame,
+                                 f"no frame for {age:.1f}s")
+                continue
+
+            if watched.min_fps:
+                fps = thread.get_stats()["fps"]
+                if fps and fps < watched.min_fps:
+                    watched.slow_since = watched.slow_since or now
+                    if now - watched.slow_since > watched.stall_timeout:
+                        self._open_event(camera_name, watched, STALL_FPS_COLLAPSE, watched.slow_since,
+                                         f"{fps:.1f} fps (expected at least {watched.min_fps})")
+                else:
+                    watched.slow_since = None
+
+    def _open_event(self, camera_name, watched, kind, started_at, details):
+        event = StallEvent(camera_name, kind, started_at, details)
+        watched.event = event
+        watched.slow_since = None
+        self.events.append(event)
+        self.stall_signal.emit(camera_name, kind, details)
+        watched.thread.force_reconnect(f"stalled ({details})")
+
+    def _check_recovery(self, camera_name, watched, now):
+        """Close the event once frames flow again; escalate if the thread never let go."""
+        thread = watched.thread
+        if thread.streaming and thread.connected_at > watched.event.forced_at:
+            # Reconnected: recovered as soon as a fresh frame arrives
+            if thread.last_frame_time() > thread.connected_at:
+                self._close_event(camera_name, watched)
+        elif thread.streaming and thread.reconnect_requested and not watched.event.restarted:
+            # Still on the old connection: the capture is stuck inside a blocking read
+            if now - watched.event.forced_at > watched.stall_timeout:
+                watched.event.restarted = True
+                self.restart_signal.emit(camera_name)
+
+    def _close_event(self, camera_name, watched):
+        event = watched.event
+        event.ended_at = time.time()
+        watched.event = None
+        self.recovered_signal.emit(camera_name, event.duration)
+
+    def summary(self):
+        """Return {camera: {count, total_seconds, longest_seconds, open}}."""
+        summary = {}
+        for event in self.events:
+            camera = summary.setdefault(event.camera_name, {
+                "count": 0, "total_seconds": 0.0, "longest_seconds": 0.0, "open": 0,
+            })
+            camera["count"] += 1
+            camera["total_seconds"] = round(camera["total_seconds"] + event.duration, 3)
+            camera["longest_seconds"] = round(max(camera["longest_seconds"], event.duration), 3)
+            camera["open"] += event.ended_at is None
+        return summary
+
+    def dump(self, folder="outputs/metrics"):
+        """Write the stall summary and all events to a timestamped JSON file and return its path."""
+        os.makedirs(folder, exist_ok=True)
+        filename = os.path.join(folder, f"stall_events_{time.strftime('%Y-%m-%d_%H-%M-%S')}.json")
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump({
+                "summary": self.summary(),
+                "events": [event.to_dict() for event in self.events],
+            }, f, indent=4)
+        return filename
@@ -0,0 +1,127 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Trigger stages in the order they happen
+STAGES = ("requested", "acquired", "inferred", "dequeued", "encoded", "written", "notified")
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_trigger_ids = itertools.count(1)
+
+
+class TriggerRecord:
+    """Timestamps of one trigger as it moves from request to UI notification."""
+
+    def __init__(self, camera_name, action):
+        self.trigger_id = f"{camera_name}#{next(_trigger_ids)}"
+        self.camera_name = camera_name
+        self.action = action
+        self.times = {"requested": time.perf_counter()}
+
+    def mark(self, stage):
+        """Record the time a stage was reached (first mark wins)."""
+        self.times.setdefault(stage, time.perf_counter())
+
+    def durations(self):
+        """
+        Return milliseconds spent in each stage plus the total.
+
+        Each stage is measured from the previous stage that was reached.
+        """
+        durations = {}
+        previous = self.times["requested"]
+        for stage in STAGES[1:]:
+            if stage in self.times:
+                durations[stage] = (self.times[stage] - previous) * 1000
+                previous = self.times[stage]
+        durations["total"] = (previous - self.times["requested"]) * 1000
+        return durations
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram plus a bounded sample window for percentiles."""
+
+    def __init__(self, max_samples=5000):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.samples = deque(maxlen=max_samples)
+        self.total = 0
+
+    def add(self, value_ms):
+        index = 0
+        while index < len(BUCKETS_MS) and value_ms > BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.samples.append(value_ms)
+        self.total += 1
+
+    def percentile(self, percent):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        def rounded(value):
+            return None if value is None else round(value, 3)
+
+        return {
+            "count": self.total,
+            "p50": rounded(self.percentile(50)),
+            "p95": rounded(self.percentile(95)),
+            "p99": rounded(self.percentile(99)),
+            "max": rounded(max(self.samples)) if self.samples else None,
+            "buckets_ms": {
+                (f"<={bound}" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}"): count
+                for i, (bound, count) in enumerate(zip(BUCKETS_MS + (None,), self.counts))
+            },
+        }
+
+
+class TriggerMetrics:
+    """Per-camera, per-stage trigger latency histograms."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # camera_name -> {stage: LatencyHistogram}
+
+    def complete(self, record):
+        """Add a finished trigger to its camera's histograms and return its durations."""
+        durations = record.durations()
+        with self.lock:
+            camera = self.histograms.setdefault(record.camera_name, {})
+            for stage, value in durations.items():
+                camera.setdefault(stage, LatencyHistogram()).add(value)
+        return durations
+
+    def summary(self, camera_name=None):
+        """Return {camera: {stage: summary}} (or just one camera's stages)."""
+        with self.lock:
+            if camera_name is not None:
+                stages = self.histograms.get(camera_name, {})
+                return {stage: histogram.summary() for stage, histogram in stages.items()}
+            return {
+                camera: {stage: histogram.summary() for stage, histogram in stages.items()}
+                for camera, stages in self.histograms.items()
+            }
+
+    def dump(self, folder="outputs/metrics"):
+        """Write all histograms to a timestamped JSON file and return its path."""
+        os.makedirs(folder, exist_ok=True)
+        filename = os.path.join(folder, f"trigger_latency_{time.strftime('%Y-%m-%d_%H-%M-%S')}.json")
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=4)
+        return filename
+
+
+_metrics = TriggerMetrics()
+
+
+def get_trigger_metrics():
+    """Return the process-wide trigger metrics."""
+    return _metrics
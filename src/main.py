@@ -1,5 +1,6 @@
 import sys
 from PySide6.QtWidgets import QApplication, QMainWindow, QSizePolicy
+from PySide6.QtCore import Qt
 from ui.camera_ui_control import CameraWidget  # ✅ Import CameraWidget
 from ui.main_window import Ui_MainWindow
 
@@ -23,6 +24,14 @@ class MainWindow(QMainWindow):
         # ✅ Optionally, connect a button to switch to CameraWidget page
         self.ui.camera_page.clicked.connect(self.show_camera_page)
 
+    def closeEvent(self, event):
+        """Close only after the camera page has stopped all camera threads."""
+        if self.camera_widget.shutdown():
+            event.accept()
+        else:
+            self.camera_widget.shutdown_finished.connect(self.close, Qt.UniqueConnection)
+            event.ignore()
+
     def show_camera_page(self):
         """Switches to the CameraWidget page."""
         self.ui.stackedWidget.setCurrentWidget(self.camera_widget)
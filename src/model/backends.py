@@ -0,0 +1,148 @@
+import os
+import shutil
+from pathlib import Path
+import numpy as np
+
+# Inference backends; all of them are loaded through ultralytics, so they return the same Results objects
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"  # ONNX Runtime, CPU execution provider
+BACKEND_OPENVINO = "openvino"
+BACKENDS = (BACKEND_TORCH, BACKEND_ONNX, BACKEND_OPENVINO)
+
+
+def exported_path(model_path, backend, int8=False):
+    """Return where the exported model of ``backend`` lives next to the .pt file."""
+    base, _ = os.path.splitext(model_path)
+    if backend == BACKEND_ONNX:
+        return f"{base}_int8.onnx" if int8 else f"{base}.onnx"
+    if backend == BACKEND_OPENVINO:
+        return f"{base}_int8_openvino_model" if int8 else f"{base}_openvino_model"
+    return model_path
+
+
+def _is_current(path, source):
+    """True if ``path`` exists and was exported after ``source`` last changed."""
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source)
+
+
+def export_model(model_path, backend, int8=False, imgsz=640, data=None):
+    """
+    Export a .pt model for ``backend`` once and return the exported path.
+
+    Exports are reused until the .pt file changes. ONNX models are exported
+    with a dynamic batch axis so the batched inference service can use them;
+    int8 ONNX models use ONNX Runtime dynamic quantization, int8 OpenVINO
+    models use ultralytics' NNCF calibration on ``data``.
+
+    ``data`` is a dataset yaml whose images calibrate the int8 OpenVINO export
+    (ideally frames from our own cameras). It is required for that export:
+    without it ultralytics downloads coco128, which fails offline and doesn't
+    match the camera scenes.
+    """
+    if backend == BACKEND_TORCH:
+        return model_path
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+    if backend == BACKEND_OPENVINO and int8 and not data:
+        raise ValueError("int8 OpenVINO export needs a calibration dataset yaml (data)")
+
+    target = exported_path(model_path, backend, int8)
+    if _is_current(target, model_path):
+        return target
+
+    from ultralytics import YOLO
+
+    print(f"📦 Exporting {model_path} to {backend}{' (int8)' if int8 else ''}...")
+    model = YOLO(model_path)
+    if backend == BACKEND_OPENVINO:
+        if int8:
+            exported = model.export(format="openvino", dynamic=True, int8=True, data=data, imgsz=imgsz)
+        else:
+            exported = model.export(format="openvino", dynamic=True, imgsz=imgsz)
+    else:
+        fp32_path = exported_path(model_path, BACKEND_ONNX)
+        exported = fp32_path
+        if not _is_current(fp32_path, model_path):
+            exported = model.export(format="onnx", dynamic=True, simplify=True, imgsz=imgsz)
+        if int8:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(exported, target, weight_type=QuantType.QUInt8)
+            exported = target
+
+    if os.path.abspath(exported) != os.path.abspath(target):
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        os.replace(exported, target)
+    print(f"✅ Exported model: {target}")
+    return target
+
+
+def load_model(model_path, backend=BACKEND_TORCH, int8=False, threads=None, overrides=None, imgsz=640,
+               progress=None, data=None):
+    """
+    Load a YOLO model on ``backend``, exporting it first if needed, and warm it up.
+
+    Args:
+        model_path (str): The .pt model
+        backend (str): One of BACKENDS
+        int8 (bool): Use the int8-quantized export (ignored for torch)
+        threads (int): CPU threads for inference (None keeps the library default)
+        overrides (dict): Predictor overrides such as conf, iou and max_det
+        progress (callable): Called with a short message before each loading step
+        data (str): Calibration dataset yaml, required for int8 OpenVINO (see export_model)
+
+    Returns:
+        ultralytics.YOLO: Model whose calls return the usual Results objects
+    """
+    progress = progress or (lambda message: None)
+    progress("Importing ultralytics")
+    from ultralytics import YOLO
+
+    if backend == BACKEND_TORCH and threads:
+        import torch
+
+        torch.set_num_threads(threads)
+
+    if backend != BACKEND_TORCH:
+        progress(f"Preparing {backend} model")
+    path = export_model(model_path, backend, int8, imgsz, data)
+    progress(f"Loading {os.path.basename(path)}")
+    model = YOLO(path, task="detect")
+    model.overrides.update(overrides or {})
+
+    # Warm up the model (this also creates the predictor whose runtime is tuned below)
+    progress("Warming up")
+    dummy_frame = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+    model(dummy_frame, verbose=False)
+
+    if threads and backend != BACKEND_TORCH:
+        _set_runtime_threads(model.predictor.model, backend, path, threads)
+        model(dummy_frame, verbose=False)
+    return model
+
+
+def _set_runtime_threads(runtime, backend, path, threads):
+    """Recreate the ONNX Runtime session / OpenVINO compiled model of ``runtime`` with ``threads``."""
+    if backend == BACKEND_ONNX and hasattr(runtime, "session"):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        runtime.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+    elif backend == BACKEND_OPENVINO and hasattr(runtime, "ov_compiled_model"):
+        import openvino as ov
+
+        core = ov.Core()
+        xml = next(Path(path).glob("*.xml"))
+        ov_model = core.read_model(model=str(xml), weights=xml.with_suffix(".bin"))
+        if ov_model.get_parameters()[0].get_layout().empty:
+            ov_model.get_parameters()[0].set_layout(ov.Layout("NCHW"))
+        runtime.ov_compiled_model = core.compile_model(
+            ov_model, device_name="CPU",
+            config={"PERFORMANCE_HINT": "LATENCY", "INFERENCE_NUM_THREADS": threads},
+        )
+    else:
+        print(f"⚠️ Can't set the thread count of the {backend} runtime, using its default")
@@ -0,0 +1,147 @@
+"""
+Compare YOLO latency, throughput and detections across inference backends.
+
+Run from the repository root, e.g.:
+    python src/model/benchmark_backends.py --frames captures --backends torch onnx openvino --int8 --data camera_calib.yaml --threads 4
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.backends import BACKENDS, BACKEND_TORCH, load_model
+from model.detections import Detections, box_iou
+from model.inference_service import DEFAULT_MODEL_PATH, INFERENCE_DEFAULTS
+from model.preprocess import LetterboxPreprocessor
+
+
+def load_frames(source, count):
+    """Read up to ``count`` BGR frames from an image folder or a video file (cycled if there are fewer)."""
+    frames = []
+    if os.path.isdir(source):
+        for path in sorted(glob.glob(os.path.join(source, "*"))):
+            frame = cv2.imread(path)
+            if frame is not None:
+                frames.append(frame)
+    else:
+        cap = cv2.VideoCapture(source)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+
+    if not frames:
+        raise SystemExit(f"❌ No frames found in {source}")
+    return [frames[i % len(frames)] for i in range(count)]
+
+
+def agreement(reference, detections, min_iou=0.5):
+    """Fraction of reference detections found again (same class, IoU >= min_iou)."""
+    total = matched = 0
+    for expected, found in zip(reference, detections):
+        total += len(expected)
+        if len(expected) and len(found):
+            same_class = expected.class_id[:, None] == found.class_id[None, :]
+            matched += int(((box_iou(expected.xyxy, found.xyxy) >= min_iou) & same_class).any(axis=1).sum())
+    return round(matched / total, 4) if total else 1.0
+
+
+def benchmark(name, model, frames, batch_size, preprocessor):
+    """Time single-frame latency and batched throughput on the same frames (preprocessing included)."""
+    latencies = []
+    detections = []
+    for frame in frames:
+        start = time.perf_counter()
+        inputs, transforms = preprocessor.prepare([frame])
+        result = model(inputs, verbose=False)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        detections.append(Detections.from_result(result, transforms[0]))
+
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        inputs, _ = preprocessor.prepare(frames[i:i + batch_size])
+        model(inputs, verbose=False)
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies)
+    return {
+        "backend": name,
+        "latency_mean_ms": round(float(latencies.mean()), 2),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "throughput_fps": round(len(frames) / elapsed, 2),
+        "batch_size": batch_size,
+    }, detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--frames", default="captures", help="Image folder or video file")
+    parser.add_argument("--count", type=int, default=100, help="Frames per backend")
+    parser.add_argument("--batch", type=int, default=INFERENCE_DEFAULTS["max_batch"], help="Batch size for throughput")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--int8", action="store_true", help="Also benchmark the int8 exports")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--data", default=INFERENCE_DEFAULTS["data"],
+                        help="Calibration dataset yaml for the int8 OpenVINO export")
+    parser.add_argument("--output", default="outputs/metrics")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, args.count)
+    overrides = {key: INFERENCE_DEFAULTS[key] for key in ("conf", "iou", "max_det")}
+    overrides["agnostic_nms"] = True
+
+    runs = [(backend, False) for backend in args.backends]
+    if args.int8:
+        runs += [(backend, True) for backend in args.backends if backend != BACKEND_TORCH]
+
+    results = []
+    reference = None
+    for backend, int8 in runs:
+        name = f"{backend}-int8" if int8 else backend
+        print(f"⏱️ Benchmarking {name} on {len(frames)} frames...")
+        start = time.perf_counter()
+        try:
+            model = load_model(args.model, backend, int8, args.threads, overrides, data=args.data)
+        except Exception as e:
+            print(f"❌ {name} unavailable: {str(e)}")
+            continue
+        load_seconds = time.perf_counter() - start
+
+        # Same preprocessing as the inference service
+        preprocessor = LetterboxPreprocessor(max_batch=args.batch, rect=backend == BACKEND_TORCH)
+        stats, detections = benchmark(name, model, frames, args.batch, preprocessor)
+        stats["load_seconds"] = round(load_seconds, 2)
+        # The first backend that ran (torch by default) is the reference for detections
+        reference = reference if reference is not None else detections
+        stats["agreement"] = agreement(reference, detections)
+        results.append(stats)
+
+    print(f"\n{'backend':<16}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'fps':>10}{'agree':>8}")
+    for stats in results:
+        print(f"{stats['backend']:<16}{stats['latency_mean_ms']:>10}{stats['latency_p50_ms']:>10}"
+              f"{stats['latency_p95_ms']:>10}{stats['throughput_fps']:>10}{stats['agreement']:>8}")
+
+    os.makedirs(args.output, exist_ok=True)
+    filename = os.path.join(args.output, f"backend_benchmark_{time.strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump({
+            "model": args.model,
+            "frames": args.frames,
+            "threads": args.threads,
+            "results": results,
+        }, f, indent=4)
+    print(f"📊 Benchmark saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
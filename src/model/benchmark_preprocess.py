@@ -0,0 +1,115 @@
+"""
+Measure allocation churn and time of YOLO input preprocessing, per call vs. preallocated.
+
+"per_call" rebuilds the letterboxed batch the way ultralytics does for numpy
+inputs (new resized, padded, stacked, transposed and normalized arrays every
+call); "preallocated" is LetterboxPreprocessor. Allocation churn is the peak
+of temporary memory traced by tracemalloc during one batch.
+
+Run from the repository root, e.g.:
+    python src/model/benchmark_preprocess.py --frames /path/to/video.mp4 --batch 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.benchmark_backends import load_frames
+from model.preprocess import LetterboxPreprocessor
+
+
+def per_call_preprocess(frames, preprocessor, rect):
+    """Letterbox into freshly allocated arrays, as ultralytics' predictor does for numpy frames."""
+    padded = []
+    for frame in frames:
+        transform = preprocessor.transform(frame.shape[:2], rect)
+        top, left = transform.offset
+        height, width = transform.resized_shape
+        canvas_height, canvas_width = transform.canvas_shape
+        resized = cv2.resize(frame, (width, height), interpolation=cv2.INTER_LINEAR)
+        padded.append(cv2.copyMakeBorder(resized, top, canvas_height - height - top, left,
+                                         canvas_width - width - left, cv2.BORDER_CONSTANT, value=(114, 114, 114)))
+    batch = np.stack(padded)[..., ::-1].transpose((0, 3, 1, 2))
+    batch = np.ascontiguousarray(batch).astype(np.float32)
+    batch /= 255
+    return batch
+
+
+def measure(name, function, batches):
+    """Return time and traced temporary memory per batch."""
+    function(batches[0])  # First call allocates caches and buffers; not part of the steady state
+    peaks = []
+    start = time.perf_counter()
+    tracemalloc.start()
+    for batch in batches:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = function(batch)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - baseline)
+        del result
+    tracemalloc.stop()
+    elapsed = time.perf_counter() - start
+    return {
+        "method": name,
+        "ms_per_batch": round(elapsed * 1000 / len(batches), 3),
+        "allocated_kb_per_batch": round(float(np.mean(peaks)) / 1024, 1),
+        "allocated_kb_max": round(max(peaks) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", default="captures", help="Image folder or video file")
+    parser.add_argument("--count", type=int, default=200, help="Frames to preprocess")
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--size", type=int, default=640)
+    parser.add_argument("--rect", action="store_true", help="Rectangular inputs (torch models)")
+    parser.add_argument("--output", default="outputs/metrics")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, args.count)
+    batches = [frames[i:i + args.batch] for i in range(0, len(frames), args.batch)]
+    preprocessor = LetterboxPreprocessor(args.size, args.batch, rect=args.rect)
+
+    def preallocated(batch):
+        return preprocessor.prepare(batch)[0]
+
+    # Both paths must produce the same model input
+    expected = per_call_preprocess(batches[0], preprocessor, args.rect)
+    difference = float(np.abs(np.asarray(preallocated(batches[0])) - expected).max())
+
+    results = [
+        measure("per_call", lambda batch: per_call_preprocess(batch, preprocessor, args.rect), batches),
+        measure("preallocated", preallocated, batches),
+    ]
+
+    print(f"\n{'method':<16}{'ms/batch':>10}{'KB/batch':>12}{'KB max':>10}")
+    for stats in results:
+        print(f"{stats['method']:<16}{stats['ms_per_batch']:>10}{stats['allocated_kb_per_batch']:>12}"
+              f"{stats['allocated_kb_max']:>10}")
+    print(f"Max input difference: {difference:.6f}")
+
+    os.makedirs(args.output, exist_ok=True)
+    filename = os.path.join(args.output, f"preprocess_benchmark_{time.strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump({
+            "frames": args.frames,
+            "frame_shape": list(frames[0].shape),
+            "batch": args.batch,
+            "size": args.size,
+            "rect": args.rect,
+            "max_input_difference": difference,
+            "results": results,
+        }, f, indent=4)
+    print(f"📊 Benchmark saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import cv2
+import numpy as np
+
+
+def box_iou(a, b):
+    """
+    Pairwise IoU of two sets of xyxy boxes.
+
+    Args:
+        a (np.ndarray): (N, 4) boxes
+        b (np.ndarray): (M, 4) boxes
+
+    Returns:
+        np.ndarray: (N, M) IoU matrix
+    """
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+class Detections:
+    """
+    Detections of one frame as contiguous arrays.
+
+    Converted once per model result; nothing here touches tensors or loops
+    over boxes except drawing, which only happens when an image is wanted.
+    """
+
+    __slots__ = ("xyxy", "confidence", "class_id", "names", "track_id")
+
+    def __init__(self, xyxy, confidence, class_id, names, track_id=None):
+        self.xyxy = xyxy  # (N, 4) float32, x1, y1, x2, y2 in frame pixels
+        self.confidence = confidence  # (N,) float32
+        self.class_id = class_id  # (N,) int32
+        self.names = names  # class_id -> label
+        self.track_id = track_id  # (N,) int64 when produced by a tracker, else None
+
+    @classmethod
+    def empty(cls, names=None):
+        return cls(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int32), names or {})
+
+    @classmethod
+    def from_result(cls, result, transform=None):
+        """
+        Convert one ultralytics result with a single device-to-host copy.
+
+        Args:
+            transform (LetterboxTransform): Maps boxes back to source pixels when the
+                model was fed a preprocessed tensor
+        """
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return cls.empty(result.names)
+        data = boxes.data.cpu().numpy()  # (N, 6): x1, y1, x2, y2, confidence, class
+        xyxy = np.array(data[:, :4], dtype=np.float32)
+        if transform is not None:
+            transform.map_boxes(xyxy)
+        return cls(
+            xyxy,
+            np.ascontiguousarray(data[:, 4], dtype=np.float32),
+            data[:, 5].astype(np.int32),
+            result.names,
+        )
+
+    @classmethod
+    def merge(cls, parts, iou=None, max_det=None):
+        """
+        Combine the detections of several crops of one frame.
+
+        Args:
+            parts (list): Detections already in full-frame coordinates
+            iou (float): Drop boxes overlapping a more confident one by more than this
+                (for overlapping regions; None keeps everything)
+            max_det (int): Keep at most this many, most confident first
+        """
+        if len(parts) == 1 and iou is None and max_det is None:
+            return parts[0]
+        names = parts[0].names if parts else {}
+        merged = cls(
+            np.concatenate([part.xyxy for part in parts]) if parts else np.zeros((0, 4), np.float32),
+            np.concatenate([part.confidence for part in parts]) if parts else np.zeros(0, np.float32),
+            np.concatenate([part.class_id for part in parts]) if parts else np.zeros(0, np.int32),
+            names,
+        )
+        order = np.argsort(-merged.confidence, kind="stable")
+        if iou is not None and len(order) > 1:
+            overlaps = box_iou(merged.xyxy, merged.xyxy)
+            suppressed = np.zeros(len(order), dtype=bool)
+            keep = []
+            for index in order:
+                if not suppressed[index]:
+                    keep.append(index)
+                    suppressed |= overlaps[index] > iou
+            order = np.array(keep, dtype=np.int64)
+        return merged[order[:max_det]]
+
+    def offset(self, x, y):
+        """Shift boxes by (x, y) in place, e.g. from crop to frame coordinates; returns self."""
+        if x or y:
+            self.xyxy += (x, y, x, y)
+        return self
+
+    def __len__(self):
+        return len(self.class_id)
+
+    def __getitem__(self, index):
+        """Select detections with a boolean mask, index array or slice."""
+        track_id = self.track_id[index] if self.track_id is not None else None
+        return Detections(self.xyxy[index], self.confidence[index], self.class_id[index], self.names, track_id)
+
+    def labels(self):
+        return [self.names[class_id] for class_id in self.class_id.tolist()]
+
+    def describe(self):
+        """Short text such as "person 0.91, car 0.85" (or "nothing")."""
+        return ", ".join(
+            f"{label} {confidence:.2f}" for label, confidence in zip(self.labels(), self.confidence.tolist())
+        ) or "nothing"
+
+    def to_list(self):
+        """Return JSON-ready dicts: [{"label", "class_id", "confidence", "box"}]."""
+        boxes = np.round(self.xyxy.astype(np.float64), 1).tolist()
+        confidences = np.round(self.confidence.astype(np.float64), 4).tolist()
+        detections = [
+            {"label": self.names[class_id], "class_id": class_id, "confidence": confidence, "box": box}
+            for box, confidence, class_id in zip(boxes, confidences, self.class_id.tolist())
+        ]
+        if self.track_id is not None:
+            for detection, track_id in zip(detections, self.track_id.tolist()):
+                detection["track_id"] = track_id
+        return detections
+
+    def draw(self, frame, copy=True, color=(0, 255, 0)):
+        """
+        Draw boxes and labels.
+
+        Args:
+            frame (np.ndarray): BGR image the detections belong to
+            copy (bool): Draw onto a copy (False draws onto ``frame`` itself)
+
+        Returns:
+            np.ndarray: The annotated image
+        """
+        canvas = frame.copy() if copy else frame
+        boxes = self.xyxy.astype(np.int32).tolist()
+        labels = self.labels()
+        if self.track_id is not None:
+            labels = [f"#{track_id} {label}" for track_id, label in zip(self.track_id.tolist(), labels)]
+        for (x1, y1, x2, y2), label, confidence in zip(boxes, labels, self.confidence.tolist()):
+            cv2.rectangle(canvas, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(canvas, f"{label} {confidence:.2f}", (x1, y1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+        return canvas
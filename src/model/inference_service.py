@@ -0,0 +1,299 @@
+import json
+import os
+import queue
+import threading
+import time
+from model.backends import BACKEND_TORCH, load_model
+from model.detections import Detections
+from model.preprocess import LetterboxPreprocessor, crop_regions
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_PATH = os.path.join(MODEL_DIR, "yolov8s.pt")
+INFERENCE_CONFIG_FILE = "src/asset/inference_config.json"
+
+# Model states reported to status listeners
+MODEL_LOADING = "loading"
+MODEL_READY = "ready"
+MODEL_FAILED = "failed"
+
+INFERENCE_DEFAULTS = {
+    "model_path": DEFAULT_MODEL_PATH,
+    "max_batch": 8,  # Largest batch run in one forward pass
+    "max_wait_ms": 15,  # How long the first request may wait for others to join its batch
+    "max_queue": 64,
+    "conf": 0.8,
+    "iou": 0.5,
+    "max_det": 5,
+    "backend": BACKEND_TORCH,  # torch, onnx or openvino (see model.backends)
+    "int8": False,  # Use the int8-quantized export (onnx/openvino only)
+    "data": None,  # Calibration dataset yaml, required for int8 openvino
+    "threads": None,  # CPU inference threads (None keeps the runtime's default)
+}
+
+
+def resolve_model_path(model_path):
+    """
+    Turn a configured model path into an absolute one on any OS.
+
+    Either separator is accepted; relative paths are looked up from the working
+    directory first, then from this folder.
+    """
+    path = os.path.normpath(model_path.replace("\\", "/"))
+    if os.path.isabs(path):
+        return path
+    for base in (os.getcwd(), MODEL_DIR):
+        candidate = os.path.join(base, path)
+        if os.path.exists(candidate):
+            return candidate
+    return os.path.join(MODEL_DIR, os.path.basename(path))
+
+
+def load_inference_settings(config_file=INFERENCE_CONFIG_FILE):
+    """Read the inference settings file, falling back to INFERENCE_DEFAULTS for missing keys."""
+    settings = dict(INFERENCE_DEFAULTS)
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, "r", encoding="utf-8") as f:
+                settings.update(json.load(f))
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"⚠️ Could not read {config_file}, using default inference settings: {str(e)}")
+    return settings
+
+
+class InferenceRequest:
+    """One frame waiting for detection, plus where to send the result."""
+
+    __slots__ = ("camera_name", "frame", "callback", "record", "rois", "crops", "submitted_at",
+                 "queue_ms", "inference_ms", "batch_size")
+
+    def __init__(self, camera_name, frame, callback, record=None, rois=None):
+        self.camera_name = camera_name
+        self.frame = frame
+        self.callback = callback  # callback(request, detections, error) on the inference thread
+        self.record = record  # Optional TriggerRecord, marked "inferred"
+        self.rois = rois  # Normalized [x1, y1, x2, y2] regions to detect in (None = whole frame)
+        self.crops = crop_regions(frame, rois)  # [(crop view, (x, y))], each one model input
+        self.submitted_at = time.perf_counter()
+
+        # Filled in when the request's batch has run
+        self.queue_ms = 0.0  # Waiting for the batch to start
+        self.inference_ms = 0.0  # Forward pass of the whole batch
+        self.batch_size = 0  # Model inputs (crops) in the batch
+
+
+class AIResult:
+    """Outcome of one AI trigger, ready for the UI or any other consumer (no image parsing needed)."""
+
+    def __init__(self, camera_name, request, detections, image_path=None):
+        self.camera_name = camera_name
+        self.trigger_id = request.record.trigger_id if request.record is not None else None
+        self.detections = detections  # Detections
+        self.inference_ms = request.inference_ms
+        self.queue_ms = request.queue_ms
+        self.batch_size = request.batch_size
+        self.rois = request.rois
+        self.image_path = image_path  # Annotated image, set once it is queued for writing
+        self.created_at = time.time()
+
+    def to_dict(self):
+        return {
+            "camera_name": self.camera_name,
+            "trigger_id": self.trigger_id,
+            "image_path": self.image_path,
+            "created_at": self.created_at,
+            "inference_ms": round(self.inference_ms, 2),
+            "queue_ms": round(self.queue_ms, 2),
+            "batch_size": self.batch_size,
+            "rois": self.rois,
+            "detections": self.detections.to_list(),
+        }
+
+
+class BatchedInferenceService:
+    """
+    One YOLO model shared by every camera.
+
+    Requests that arrive within max_wait_ms of each other are stacked into a
+    single forward pass, so N cameras triggering together cost one batched
+    inference instead of N model instances.
+    """
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, max_batch=8, max_wait_ms=15, max_queue=64,
+                 conf=0.8, iou=0.5, max_det=5, backend=BACKEND_TORCH, int8=False, threads=None,
+                 data=None):
+        self.model_path = resolve_model_path(model_path)
+        self.backend = backend
+        self.int8 = int8
+        self.data = data
+        self.threads = threads
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.overrides = {"conf": conf, "iou": iou, "agnostic_nms": True, "max_det": max_det}
+        # Letterboxed into reused buffers; only torch models may use rectangular (non-square) inputs
+        self.preprocessor = LetterboxPreprocessor(max_batch=max_batch, rect=backend == BACKEND_TORCH)
+        self.requests = queue.Queue(maxsize=max_queue)
+
+        self.model = None
+        self.load_error = None
+        self.status = MODEL_LOADING
+        self.status_message = "Waiting to load"
+        self.status_listeners = []  # callback(status, message), called from the inference thread
+
+        # Counters
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.frames = 0
+        self.inputs = 0  # Frames or ROI crops run through the model
+        self.rejected = 0
+
+        # The model is loaded on the worker thread so creating the service never blocks the UI;
+        # requests submitted meanwhile wait in the queue until it is ready
+        self.thread = threading.Thread(target=self._work, name="yolo-inference", daemon=True)
+        self.thread.start()
+
+    def submit(self, camera_name, frame, callback, record=None, rois=None):
+        """
+        Queue a BGR frame for detection.
+
+        With ``rois`` only those regions are detected in, each cropped at full
+        resolution and batched like a frame of its own; boxes come back in
+        full-frame coordinates.
+
+        Returns:
+            bool: False if the queue is full (the callback is not called)
+        """
+        try:
+            self.requests.put_nowait(InferenceRequest(camera_name, frame, callback, record, rois))
+            return True
+        except queue.Full:
+            with self.lock:
+                self.rejected += 1
+            return False
+
+    @property
+    def ready(self):
+        return self.status == MODEL_READY
+
+    def add_status_listener(self, callback):
+        """Call ``callback(status, message)`` now and on every model state change."""
+        with self.lock:
+            self.status_listeners.append(callback)
+            status, message = self.status, self.status_message
+        callback(status, message)
+
+    def _set_status(self, status, message):
+        with self.lock:
+            self.status = status
+            self.status_message = message
+            listeners = list(self.status_listeners)
+        for callback in listeners:
+            try:
+                callback(status, message)
+            except Exception as e:
+                print(f"⚠️ Model status listener failed: {str(e)}")
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "queued": self.requests.qsize(),
+                "batches": self.batches,
+                "frames": self.frames,
+                "inputs": self.inputs,
+                "average_batch": round(self.inputs / self.batches, 2) if self.batches else 0.0,
+                "rejected": self.rejected,
+                "backend": self.backend,
+                "model_status": self.status,
+            }
+
+    def _load_model(self):
+        return load_model(self.model_path, self.backend, self.int8, self.threads, self.overrides,
+                          progress=lambda message: self._set_status(MODEL_LOADING, message), data=self.data)
+
+    def _work(self):
+        try:
+            self.model = self._load_model()
+            self._set_status(MODEL_READY, f"{os.path.basename(self.model_path)} ({self.backend}{', int8' if self.int8 else ''})")
+        except Exception as e:
+            self.load_error = f"Could not load model {self.model_path}: {str(e)}"
+            self._set_status(MODEL_FAILED, self.load_error)
+
+        while True:
+            batch = [self.requests.get()]
+            inputs = len(batch[0].crops)
+
+            # Let requests that arrive shortly after the first one share its forward pass
+            deadline = time.perf_counter() + self.max_wait
+            while inputs < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                inputs += len(batch[-1].crops)
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        if self.model is None:
+            for request in batch:
+                self._notify(request, None, self.load_error)
+            return
+
+        # Crops of every request go through one forward pass
+        crops = [crop for request in batch for crop, _ in request.crops]
+        start = time.perf_counter()
+        try:
+            inputs, transforms = self.preprocessor.prepare(crops)
+            results = iter(zip(self.model(inputs, verbose=False), transforms))
+        except Exception as e:
+            for request in batch:
+                self._notify(request, None, str(e))
+            return
+
+        with self.lock:
+            self.batches += 1
+            self.frames += len(batch)
+            self.inputs += len(crops)
+
+        inference_ms = (time.perf_counter() - start) * 1000
+        for request in batch:
+            parts = [
+                Detections.from_result(result, transform).offset(*origin)
+                for (_, origin), (result, transform) in zip(request.crops, results)
+            ]
+            detections = parts[0] if len(parts) == 1 else Detections.merge(
+                parts, self.overrides["iou"], self.overrides["max_det"]
+            )
+            request.queue_ms = (start - request.submitted_at) * 1000
+            request.inference_ms = inference_ms
+            request.batch_size = len(crops)
+            if request.record is not None:
+                request.record.mark("inferred")
+            self._notify(request, detections, None)
+
+    @staticmethod
+    def _notify(request, detections, error):
+        try:
+            request.callback(request, detections, error)
+        except Exception as e:
+            print(f"⚠️ Inference callback failed for {request.camera_name}: {str(e)}")
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_inference_service(**settings):
+    """
+    Return the process-wide inference service, creating it on first use.
+
+    Settings (see INFERENCE_DEFAULTS) only take effect on the first call; the
+    UI creates the service with the settings file once the window is up.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = BatchedInferenceService(**{**INFERENCE_DEFAULTS, **settings})
+        return _service
@@ -1,20 +1,38 @@
-from ultralytics import YOLO
-import cv2
-import numpy as np
 import threading
 import queue
+from model.backends import BACKEND_TORCH, load_model
+from model.detections import Detections
+from model.inference_service import DEFAULT_MODEL_PATH, resolve_model_path
+from model.preprocess import LetterboxPreprocessor, crop_regions
+from model.tracker import DetectionScheduler
 
 class YOLOThread:
-    def __init__(self):
-        self.model = YOLO("src\model\yolov8s.pt")
-        self.model.overrides['conf'] = 0.8
-        self.model.overrides['iou'] = 0.5
-        self.model.overrides['agnostic_nms'] = True
-        self.model.overrides['max_det'] = 5
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, backend=BACKEND_TORCH, int8=False, threads=None,
+                 motion_gate=None, rois=None, tracker=None, detect_every=5, data=None):
+        # Loaded on the worker thread by start(), so creating a YOLOThread is instant;
+        # frames added before the model is ready wait in the queue
+        self.model_path = resolve_model_path(model_path)
+        self.backend = backend
+        self.int8 = int8
+        self.data = data  # Calibration dataset yaml for int8 OpenVINO
+        self.threads = threads
+        self.model = None
+        # Normalized [x1, y1, x2, y2] regions detected in at full resolution, one batch per frame
+        self.rois = rois or None
+        self.preprocessor = LetterboxPreprocessor(max_batch=len(rois or [None]), rect=backend == BACKEND_TORCH)
+        self.ready = threading.Event()
+        self.load_error = None
         
-        # Warm up the model
-        dummy_frame = np.zeros((640, 640, 3), dtype=np.uint8)
-        _ = self.model(dummy_frame)
+        # Optional MotionGate: frames without meaningful change reuse the last detections
+        self.motion_gate = motion_gate
+        self.last_detections = None
+        
+        # Optional IoUTracker: the model only runs every detect_every frames (and, with a
+        # motion gate, right away on change); boxes are carried by the tracker in between
+        self.tracker = tracker
+        self.scheduler = DetectionScheduler(detect_every, motion_gate) if tracker is not None else None
+        self.frame_sequence = 0  # Frames offered to add_frame, so dropped frames still advance the tracker
+        self.last_sequence = 0
         
         self.running = False
         self.frame_queue = queue.Queue(maxsize=1)  # Single image processing
@@ -34,46 +52,103 @@ class YOLOThread:
             self.thread.join()
         print("YOLO thread stopped!")
         
+    def _load_model(self):
+        # Exports to ONNX/OpenVINO on first use; results are the same ultralytics objects on every backend
+        try:
+            self.model = load_model(
+                self.model_path, self.backend, self.int8, self.threads,
+                overrides={'conf': 0.8, 'iou': 0.5, 'agnostic_nms': True, 'max_det': 5}, data=self.data,
+            )
+            print("YOLO model ready!")
+            return True
+        except Exception as e:
+            self.load_error = str(e)
+            print(f"❌ Could not load YOLO model {self.model_path}: {self.load_error}")
+            return False
+        finally:
+            self.ready.set()
+    
     def _process_frames(self):
+        if self.model is None and not self._load_model():
+            self.running = False
+            return
         while self.running:
             try:
-                frame = self.frame_queue.get(timeout=1.0)
-                results = self.model(frame)
-                annotated_frame = self._annotate_frame(frame, results)
-                self.result_queue.put(annotated_frame)
+                frame, sequence = self.frame_queue.get(timeout=1.0)
+                if self.tracker is None:
+                    self.last_detections = self._detect(frame)
+                else:
+                    steps = sequence - self.last_sequence
+                    self.last_sequence = sequence
+                    if self.scheduler.should_detect(frame, steps):
+                        self.last_detections = self.tracker.update(self._detect(frame), steps, self.scheduler.moving)
+                    else:
+                        # Tracks hold still while the motion gate sees a static scene
+                        self.last_detections = self.tracker.predict(steps, self.scheduler.moving)
+                # Drawing waits until get_result() asks for an image
+                self._publish(frame, self.last_detections)
                 self.frame_queue.task_done()
             except queue.Empty:
                 continue
                 
-    def _annotate_frame(self, frame, results):
-        for det in results:
-            for box in det.boxes:
-                x, y, w, h = box.xywh[0]
-                conf = box.conf[0]
-                cls = int(box.cls[0])
-                label = f"{det.names[cls]} {conf:.2f}"
-                
-                cv2.rectangle(frame, 
-                            (int(x-w/2), int(y-h/2)), 
-                            (int(x+w/2), int(y+h/2)), 
-                            (0, 255, 0), 2)
-                cv2.putText(frame, label, 
-                          (int(x-w/2), int(y-h/2)-10), 
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.5, 
-                          (0, 255, 0), 2)
-        return frame
+    def _detect(self, frame):
+        crops = crop_regions(frame, self.rois)
+        inputs, transforms = self.preprocessor.prepare([crop for crop, _ in crops])
+        results = self.model(inputs, verbose=False)
+        parts = [
+            Detections.from_result(result, transform).offset(*origin)
+            for result, transform, (_, origin) in zip(results, transforms, crops)
+        ]
+        return parts[0] if len(parts) == 1 else Detections.merge(parts, iou=0.5, max_det=5)
+    
+    def _publish(self, frame, detections):
+        """Replace any unread result with the newest one."""
+        try:
+            self.result_queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self.result_queue.put_nowait((frame, detections))
+        except queue.Full:
+            pass
     
     def add_frame(self, frame):
         if not self.running:
             return False
+        self.frame_sequence += 1
+        if self.frame_queue.full():
+            return False
+        if self.tracker is None and self.motion_gate is not None and self.last_detections is not None \
+                and not self.motion_gate.check(frame):
+            # Static scene: the previous detections still apply to this frame
+            self._publish(frame, self.last_detections)
+            return True
         try:
-            self.frame_queue.put_nowait(frame)
+            self.frame_queue.put_nowait((frame, self.frame_sequence))
             return True
         except queue.Full:
+            if self.tracker is None and self.motion_gate is not None:
+                self.motion_gate.reset()  # The changed frame was dropped, so don't compare against it
             return False
             
-    def get_result(self):
+    def get_result(self, annotated=True):
+        """
+        Return the newest result, or None.
+        
+        Args:
+            annotated (bool): Return an annotated copy of the frame; False returns
+                the (frame, Detections) pair without drawing anything
+        """
         try:
-            return self.result_queue.get_nowait()
+            frame, detections = self.result_queue.get_nowait()
         except queue.Empty:
-            return None
\ No newline at end of file
+            return None
+        return detections.draw(frame) if annotated else (frame, detections)
+    
+    def get_stats(self):
+        """Frames processed vs. frames that actually ran the model (with tracking)."""
+        stats = {"frames_offered": self.frame_sequence}
+        if self.scheduler is not None:
+            stats.update(self.scheduler.get_stats())
+            stats["tracks"] = len(self.tracker.tracks)
+        return stats
\ No newline at end of file
@@ -0,0 +1,114 @@
+import time
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap frame-differencing check that decides whether a frame is worth running the detector on.
+
+    Frames are shrunk to a small grayscale thumbnail and compared with the last
+    frame that was let through (not simply the previous one, so slow changes
+    still add up). Only frames where enough pixels changed are forwarded;
+    callers reuse their previous detections for the others.
+    """
+
+    def __init__(self, width=160, pixel_threshold=25, min_changed_ratio=0.005, blur=5,
+                 regions=None, ignore=None, max_skip_seconds=10.0):
+        """
+        Args:
+            width (int): Thumbnail width used for differencing
+            pixel_threshold (int): Gray-level difference (0-255) for a pixel to count as changed
+            min_changed_ratio (float): Fraction of watched pixels that must change to forward a frame
+            blur (int): Gaussian blur kernel size against sensor noise (0 disables)
+            regions (list): Polygons to watch, as [[x, y], ...] in 0-1 frame coordinates (None = whole frame)
+            ignore (list): Polygons to never watch, e.g. timestamp overlays
+            max_skip_seconds (float): Forward a frame at least this often anyway (None never forces)
+        """
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_ratio = min_changed_ratio
+        self.blur = blur | 1 if blur else 0  # Kernel size must be odd
+        self.regions = regions
+        self.ignore = ignore
+        self.max_skip_seconds = max_skip_seconds
+
+        self.reference = None  # Thumbnail of the last forwarded frame
+        self.mask = None  # Watched pixels of the thumbnail (None = all)
+        self.watched_pixels = 0
+        self.source_shape = None
+        self.last_forwarded = 0.0
+        self.last_changed_ratio = 0.0
+
+        # Counters
+        self.checked = 0
+        self.forwarded = 0
+
+    def check(self, frame):
+        """Return True if ``frame`` changed enough to run the detector on it."""
+        self.checked += 1
+        thumbnail = self._thumbnail(frame)
+        now = time.monotonic()
+
+        if self.reference is None or self.reference.shape != thumbnail.shape:
+            changed = True
+        else:
+            difference = cv2.absdiff(thumbnail, self.reference)
+            changed_pixels = difference > self.pixel_threshold
+            if self.mask is not None:
+                changed_pixels &= self.mask
+            self.last_changed_ratio = np.count_nonzero(changed_pixels) / self.watched_pixels
+            changed = self.last_changed_ratio >= self.min_changed_ratio
+            if not changed and self.max_skip_seconds is not None:
+                changed = now - self.last_forwarded >= self.max_skip_seconds
+
+        if changed:
+            self.reference = thumbnail
+            self.last_forwarded = now
+            self.forwarded += 1
+        return changed
+
+    def reset(self):
+        """Forward the next frame regardless of motion (e.g. after a reconnect)."""
+        self.reference = None
+
+    def _thumbnail(self, frame):
+        height, width = frame.shape[:2]
+        thumbnail_height = max(1, round(height * self.width / width))
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumbnail = cv2.resize(gray, (self.width, thumbnail_height), interpolation=cv2.INTER_AREA)
+        if self.blur:
+            thumbnail = cv2.GaussianBlur(thumbnail, (self.blur, self.blur), 0)
+        if (height, width) != self.source_shape:
+            self._build_mask(thumbnail.shape)
+            self.source_shape = (height, width)
+        return thumbnail
+
+    def _build_mask(self, shape):
+        if not self.regions and not self.ignore:
+            self.mask = None
+            self.watched_pixels = shape[0] * shape[1]
+            return
+
+        scale = np.array([shape[1], shape[0]], dtype=np.float32)
+
+        def polygons(normalized):
+            return [np.round(np.asarray(polygon, dtype=np.float32) * scale).astype(np.int32)
+                    for polygon in normalized]
+
+        mask = np.zeros(shape, dtype=np.uint8) if self.regions else np.full(shape, 255, dtype=np.uint8)
+        if self.regions:
+            cv2.fillPoly(mask, polygons(self.regions), 255)
+        if self.ignore:
+            cv2.fillPoly(mask, polygons(self.ignore), 0)
+        self.mask = mask > 0
+        self.watched_pixels = max(1, int(np.count_nonzero(self.mask)))
+
+    def get_stats(self):
+        return {
+            "checked": self.checked,
+            "forwarded": self.forwarded,
+            "skipped": self.checked - self.forwarded,
+            "skip_ratio": round(1 - self.forwarded / self.checked, 3) if self.checked else 0.0,
+            "changed_ratio": round(float(self.last_changed_ratio), 4),
+        }
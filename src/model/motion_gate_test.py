@@ -0,0 +1,85 @@
+import os
+import sys
+import unittest
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.motion_gate import MotionGate
+
+HEIGHT, WIDTH = 720, 1280
+
+# Belt with slats, and a small bank of sensor noise patterns (sigma 2) cycled through
+BELT = np.full((HEIGHT, WIDTH, 3), 90, dtype=np.int16)
+BELT[:, ::40] = 60
+NOISE = np.round(np.random.default_rng(0).normal(0, 2.0, (8, HEIGHT, WIDTH, 3))).astype(np.int16)
+
+
+def conveyor_frame(index, box_x=None):
+    """Frame ``index`` of the static belt, plus a 160 px box at ``box_x`` if given."""
+    frame = BELT.copy()
+    if box_x is not None:
+        frame[280:440, box_x:box_x + 160] = (40, 140, 220)
+    frame += NOISE[index % len(NOISE)]
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+class MotionGateTest(unittest.TestCase):
+
+    def test_first_frame_is_forwarded(self):
+        gate = MotionGate(max_skip_seconds=None)
+        self.assertTrue(gate.check(conveyor_frame(0)))
+
+    def test_sensor_noise_is_skipped(self):
+        gate = MotionGate(max_skip_seconds=None)
+        for index in range(50):
+            gate.check(conveyor_frame(index))
+        self.assertEqual(gate.get_stats()["forwarded"], 1)
+
+    def test_idle_conveyor_skips_most_frames(self):
+        # 300 frames, one box crossing the belt during 12 of them
+        gate = MotionGate(max_skip_seconds=None)
+        moving = {}
+        for index in range(300):
+            box_x = (index - 100) * 100 if 100 <= index < 112 else None
+            frame = conveyor_frame(index, box_x)
+            forwarded = gate.check(frame)
+            if box_x is not None:
+                moving[index] = forwarded
+
+        self.assertTrue(all(moving.values()), "every frame with the box moving should be forwarded")
+        stats = gate.get_stats()
+        self.assertEqual(stats["checked"], 300)
+        self.assertGreaterEqual(stats["skip_ratio"], 0.95)
+
+    def test_ignored_region_does_not_trigger(self):
+        # A changing timestamp overlay in the top-left corner
+        gate = MotionGate(ignore=[[[0, 0], [0.3, 0], [0.3, 0.1], [0, 0.1]]], max_skip_seconds=None)
+        for second in range(20):
+            frame = conveyor_frame(second)
+            cv2.putText(frame, f"12:00:{second:02d}", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+            gate.check(frame)
+        self.assertEqual(gate.get_stats()["forwarded"], 1)
+
+    def test_change_outside_watched_region_does_not_trigger(self):
+        gate = MotionGate(regions=[[[0.5, 0], [1, 0], [1, 1], [0.5, 1]]], max_skip_seconds=None)
+        gate.check(conveyor_frame(0))
+        self.assertFalse(gate.check(conveyor_frame(1, box_x=100)))
+        self.assertTrue(gate.check(conveyor_frame(2, box_x=900)))
+
+    def test_reset_forwards_next_frame(self):
+        gate = MotionGate(max_skip_seconds=None)
+        gate.check(conveyor_frame(0))
+        self.assertFalse(gate.check(conveyor_frame(1)))
+        gate.reset()
+        self.assertTrue(gate.check(conveyor_frame(2)))
+
+    def test_max_skip_seconds_forces_a_frame(self):
+        gate = MotionGate(max_skip_seconds=0)
+        gate.check(conveyor_frame(0))
+        self.assertTrue(gate.check(conveyor_frame(1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import cv2
+import numpy as np
+
+
+def roi_boxes(rois, frame_shape):
+    """
+    Convert normalized regions of interest to pixel boxes.
+
+    Args:
+        rois (list): [[x1, y1, x2, y2], ...] in 0-1 frame coordinates
+        frame_shape (tuple): (height, width, ...) of the frame
+
+    Returns:
+        list: [(x1, y1, x2, y2)] integer pixel boxes, empty regions left out
+    """
+    height, width = frame_shape[:2]
+    boxes = []
+    for x1, y1, x2, y2 in rois:
+        box = (max(0, int(x1 * width)), max(0, int(y1 * height)),
+               min(width, int(round(x2 * width))), min(height, int(round(y2 * height))))
+        if box[2] > box[0] and box[3] > box[1]:
+            boxes.append(box)
+    return boxes
+
+
+def crop_regions(frame, rois=None):
+    """
+    Return [(crop, (x, y))] for each region of interest, or the whole frame without ROIs.
+
+    Crops are views into ``frame``; (x, y) is the crop's top-left corner in the frame.
+    """
+    boxes = roi_boxes(rois, frame.shape) if rois else []
+    if not boxes:
+        return [(frame, (0, 0))]
+    return [(frame[y1:y2, x1:x2], (x1, y1)) for x1, y1, x2, y2 in boxes]
+
+
+class LetterboxTransform:
+    """Letterbox geometry of one source resolution: resize scale and padding offset."""
+
+    __slots__ = ("source_shape", "canvas_shape", "resized_shape", "scale", "offset")
+
+    def __init__(self, source_shape, size=640, stride=32, rect=False):
+        """
+        Args:
+            source_shape (tuple): (height, width) of the camera frames
+            size (int): Longest side after resizing
+            stride (int): Model stride; rect canvases are padded to a multiple of it
+            rect (bool): Pad only up to the stride multiple instead of a size x size square
+        """
+        height, width = source_shape
+        scale = min(size / height, size / width)
+        resized_height, resized_width = round(height * scale), round(width * scale)
+        if rect:
+            canvas_height = resized_height + (size - resized_height) % stride
+            canvas_width = resized_width + (size - resized_width) % stride
+        else:
+            canvas_height = canvas_width = size
+
+        self.source_shape = (height, width)
+        self.canvas_shape = (canvas_height, canvas_width)
+        self.resized_shape = (resized_height, resized_width)
+        self.scale = scale
+        # Same rounding as ultralytics' LetterBox, so boxes match its own preprocessing
+        self.offset = (round((canvas_height - resized_height) / 2 - 0.1),
+                       round((canvas_width - resized_width) / 2 - 0.1))
+
+    def map_boxes(self, xyxy):
+        """Map (N, 4) canvas boxes back to source pixels, in place."""
+        top, left = self.offset
+        xyxy -= (left, top, left, top)
+        xyxy /= self.scale
+        np.clip(xyxy[:, 0::2], 0, self.source_shape[1], out=xyxy[:, 0::2])
+        np.clip(xyxy[:, 1::2], 0, self.source_shape[0], out=xyxy[:, 1::2])
+        return xyxy
+
+
+class InputBuffers:
+    """Preallocated letterbox canvases and the model input built from them, for one canvas shape."""
+
+    def __init__(self, canvas_shape, capacity, pad_value):
+        import torch
+
+        height, width = canvas_shape
+        self.canvas = np.full((capacity, height, width, 3), pad_value, dtype=np.uint8)
+        self.input = np.empty((capacity, 3, height, width), dtype=np.float32)
+        self.tensor = torch.from_numpy(self.input)  # Shares memory with self.input
+        self.slots = [None] * capacity  # Transform each canvas was last padded for
+
+
+class LetterboxPreprocessor:
+    """
+    Letterbox, BGR->RGB, HWC->CHW and 0-1 scaling into reused buffers.
+
+    Camera resolutions rarely change, so geometry is cached per source shape
+    and every batch is written into the same preallocated arrays. Feed the
+    returned tensor to the model and map boxes back with the transforms.
+    """
+
+    def __init__(self, size=640, max_batch=8, stride=32, rect=False, pad_value=114):
+        """
+        Args:
+            rect (bool): Use minimal stride-multiple padding when a batch has one source
+                shape (torch models and dynamic exports only; static exports need squares)
+        """
+        self.size = size
+        self.max_batch = max_batch
+        self.stride = stride
+        self.rect = rect
+        self.pad_value = pad_value
+        self.transforms = {}  # (height, width, rect) -> LetterboxTransform
+        self.buffers = {}  # canvas shape -> InputBuffers
+
+    def transform(self, source_shape, rect=False):
+        key = (*source_shape, rect)
+        transform = self.transforms.get(key)
+        if transform is None:
+            transform = LetterboxTransform(source_shape, self.size, self.stride, rect)
+            self.transforms[key] = transform
+        return transform
+
+    def prepare(self, frames):
+        """
+        Letterbox BGR frames into the model input.
+
+        Returns:
+            tuple: (float32 tensor (N, 3, H, W) in [0, 1], [LetterboxTransform] per frame).
+                The tensor is overwritten by the next call.
+        """
+        rect = self.rect and len({frame.shape[:2] for frame in frames}) == 1
+        transforms = [self.transform(frame.shape[:2], rect) for frame in frames]
+        buffers = self._buffers(transforms[0].canvas_shape, len(frames))
+
+        for i, (frame, transform) in enumerate(zip(frames, transforms)):
+            canvas = buffers.canvas[i]
+            if buffers.slots[i] is not transform:
+                # A different geometry used this slot last, so its padding is stale
+                canvas[:] = self.pad_value
+                buffers.slots[i] = transform
+            top, left = transform.offset
+            height, width = transform.resized_shape
+            cv2.resize(frame, (width, height), dst=canvas[top:top + height, left:left + width],
+                       interpolation=cv2.INTER_LINEAR)
+            np.multiply(canvas[:, :, ::-1].transpose(2, 0, 1), np.float32(1 / 255),
+                        out=buffers.input[i], dtype=np.float32)
+
+        return buffers.tensor[:len(frames)], transforms
+
+    def _buffers(self, canvas_shape, count):
+        buffers = self.buffers.get(canvas_shape)
+        if buffers is None or len(buffers.slots) < count:
+            buffers = InputBuffers(canvas_shape, max(self.max_batch, count), self.pad_value)
+            self.buffers[canvas_shape] = buffers
+        return buffers
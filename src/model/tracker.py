@@ -0,0 +1,283 @@
+import time
+from collections import deque
+import numpy as np
+from model.detections import Detections, box_iou
+
+# Kinds of track events
+TRACK_STARTED = "started"  # Track confirmed (seen in min_hits detection rounds)
+TRACK_ENDED = "ended"  # Confirmed track not re-detected for max_misses detection rounds
+
+
+class KalmanBoxFilter:
+    """Constant-velocity Kalman filter over a box's centre and size: [cx, cy, w, h] + velocities."""
+
+    # Noise relative to the box height, as in DeepSORT
+    POSITION_NOISE = 1 / 20
+    VELOCITY_NOISE = 1 / 160
+
+    def __init__(self, box):
+        self.state = np.zeros(8)
+        self.state[:4] = self._measurement(box)
+        height = self.state[3]
+        self.covariance = np.diag(np.square([
+            2 * self.POSITION_NOISE * height, 2 * self.POSITION_NOISE * height,
+            2 * self.POSITION_NOISE * height, 2 * self.POSITION_NOISE * height,
+            10 * self.VELOCITY_NOISE * height, 10 * self.VELOCITY_NOISE * height,
+            10 * self.VELOCITY_NOISE * height, 10 * self.VELOCITY_NOISE * height,
+        ]))
+
+    @staticmethod
+    def _measurement(box):
+        x1, y1, x2, y2 = box
+        return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1])
+
+    def predict(self, steps=1):
+        """Advance the state by ``steps`` frames."""
+        transition = np.eye(8)
+        transition[:4, 4:] = steps * np.eye(4)
+        height = self.state[3]
+        noise = np.diag(np.square(
+            [self.POSITION_NOISE * height] * 4 + [self.VELOCITY_NOISE * height] * 4
+        )) * steps
+        self.state = transition @ self.state
+        self.state[2:4] = np.maximum(self.state[2:4], 1.0)  # Keep a valid box size
+        self.covariance = transition @ self.covariance @ transition.T + noise
+
+    def stop(self):
+        """Drop the velocity, e.g. while the scene is known to be static."""
+        self.state[4:] = 0.0
+
+    def update(self, box):
+        """Correct the state with a detected box."""
+        height = self.state[3]
+        measurement_noise = np.diag(np.square([self.POSITION_NOISE * height] * 4))
+        projected = self.covariance[:4, :4] + measurement_noise
+        gain = self.covariance[:, :4] @ np.linalg.inv(projected)
+        self.state = self.state + gain @ (self._measurement(box) - self.state[:4])
+        self.covariance = self.covariance - gain @ self.covariance[:4, :]
+
+    def box(self):
+        cx, cy, w, h = self.state[:4]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], dtype=np.float32)
+
+
+class Track:
+    """One object followed across frames."""
+
+    def __init__(self, track_id, box, confidence, class_id, label):
+        self.track_id = track_id
+        self.filter = KalmanBoxFilter(box)
+        self.confidence = confidence
+        self.class_id = class_id
+        self.label = label
+        self.hits = 1  # Detection rounds the track was matched in
+        self.misses = 0  # Consecutive detection rounds without a match
+        self.frames = 0  # Frames the track was reported in
+        self.confirmed = False
+        self.first_seen = time.time()
+        self.last_seen = self.first_seen
+
+
+class TrackEvent:
+    """A track starting or ending."""
+
+    def __init__(self, kind, track):
+        self.kind = kind
+        self.track_id = track.track_id
+        self.label = track.label
+        self.class_id = track.class_id
+        self.box = track.filter.box()
+        self.first_seen = track.first_seen
+        self.timestamp = time.time()
+        self.frames = track.frames
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "track_id": self.track_id,
+            "label": self.label,
+            "class_id": self.class_id,
+            "box": [round(float(v), 1) for v in self.box],
+            "first_seen": self.first_seen,
+            "timestamp": self.timestamp,
+            "duration": round(self.timestamp - self.first_seen, 3),
+            "frames": self.frames,
+        }
+
+
+class IoUTracker:
+    """
+    Associates detections with Kalman-predicted tracks by IoU and carries boxes between detections.
+
+    update() is called on frames that ran the detector, predict() on the frames
+    in between; both return the tracked boxes as Detections with track ids.
+    Pass moving=False while a motion gate reports a static scene, so tracks
+    stay put instead of drifting along their last velocity.
+    """
+
+    def __init__(self, iou_threshold=0.3, min_hits=2, max_misses=2, on_event=None, max_events=1000):
+        """
+        Args:
+            iou_threshold (float): Minimum IoU between a predicted track and a detection to match them
+            min_hits (int): Detection rounds before a track is confirmed (and its start reported)
+            max_misses (int): Detection rounds a track may go unmatched before it ends
+            on_event (callable): Called with each TrackEvent (on the caller's thread)
+        """
+        self.iou_threshold = iou_threshold
+        self.min_hits = min_hits
+        self.max_misses = max_misses
+        self.on_event = on_event
+        self.events = deque(maxlen=max_events)  # Recent TrackEvents, oldest first
+        self.tracks = []
+        self.names = {}
+        self.next_id = 1
+
+    def predict(self, steps=1, moving=True):
+        """Move every track ``steps`` frames ahead without a detection."""
+        self._advance(steps, moving)
+        return self._output()
+
+    def update(self, detections, steps=1, moving=True):
+        """
+        Match a new set of detections to the tracks.
+
+        Args:
+            detections (Detections): Detector output for this frame
+            steps (int): Frames since the previous predict()/update() call
+            moving (bool): False when nothing moved since the last detection
+        """
+        self.names = detections.names or self.names
+        self._advance(steps, moving)
+
+        matches, unmatched = self._associate(detections)
+        now = time.time()
+        for track, index in matches:
+            track.filter.update(detections.xyxy[index])
+            track.confidence = float(detections.confidence[index])
+            track.hits += 1
+            track.misses = 0
+            track.last_seen = now
+        matched = {track for track, _ in matches}
+        for track in self.tracks:
+            if track not in matched:
+                track.misses += 1
+
+        for index in unmatched:
+            class_id = int(detections.class_id[index])
+            self.tracks.append(Track(self.next_id, detections.xyxy[index], float(detections.confidence[index]),
+                                     class_id, self.names.get(class_id, str(class_id))))
+            self.next_id += 1
+
+        alive = []
+        for track in self.tracks:
+            if track.misses > self.max_misses:
+                if track.confirmed:
+                    self._emit(TRACK_ENDED, track)
+                continue
+            if not track.confirmed and track.hits >= self.min_hits:
+                track.confirmed = True
+                self._emit(TRACK_STARTED, track)
+            alive.append(track)
+        self.tracks = alive
+        return self._output()
+
+    def _advance(self, steps, moving):
+        for track in self.tracks:
+            if not moving:
+                track.filter.stop()
+            track.filter.predict(steps)
+
+    def _associate(self, detections):
+        """Greedy highest-IoU matching between tracks and detections of the same class."""
+        if not self.tracks or not len(detections):
+            return [], list(range(len(detections)))
+
+        predicted = np.stack([track.filter.box() for track in self.tracks])
+        track_classes = np.array([track.class_id for track in self.tracks])
+        overlaps = box_iou(predicted, detections.xyxy)
+        overlaps[track_classes[:, None] != detections.class_id[None, :]] = 0
+
+        matches = []
+        used_tracks, used_detections = set(), set()
+        for flat in np.argsort(-overlaps, axis=None):
+            track_index, detection_index = np.unravel_index(flat, overlaps.shape)
+            if overlaps[track_index, detection_index] < self.iou_threshold:
+                break
+            if track_index in used_tracks or detection_index in used_detections:
+                continue
+            used_tracks.add(track_index)
+            used_detections.add(detection_index)
+            matches.append((self.tracks[track_index], int(detection_index)))
+        unmatched = [index for index in range(len(detections)) if index not in used_detections]
+        return matches, unmatched
+
+    def _output(self):
+        """Tracks matched in the last detection round, at their current (predicted) position."""
+        visible = [track for track in self.tracks if track.misses == 0]
+        for track in visible:
+            track.frames += 1
+        if not visible:
+            empty = Detections.empty(self.names)
+            empty.track_id = np.zeros(0, dtype=np.int64)
+            return empty
+        return Detections(
+            np.stack([track.filter.box() for track in visible]),
+            np.array([track.confidence for track in visible], dtype=np.float32),
+            np.array([track.class_id for track in visible], dtype=np.int32),
+            self.names,
+            np.array([track.track_id for track in visible], dtype=np.int64),
+        )
+
+    def _emit(self, kind, track):
+        event = TrackEvent(kind, track)
+        self.events.append(event)
+        if self.on_event is not None:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                print(f"⚠️ Track event handler failed: {str(e)}")
+
+
+class DetectionScheduler:
+    """
+    Decides which frames run the detector: every ``detect_every`` frames, and with a
+    MotionGate also right away when a static scene starts moving.
+    """
+
+    def __init__(self, detect_every=5, motion_gate=None):
+        self.detect_every = max(1, detect_every)
+        self.motion_gate = motion_gate
+        self.frames_since_detection = None  # None until the first detection
+        self.moving = True  # False while the motion gate sees a static scene (pass to the tracker)
+
+        # Counters
+        self.frames = 0
+        self.detections = 0
+
+    def should_detect(self, frame, steps=1):
+        """
+        Args:
+            steps (int): Frames since the previous call (more than 1 when frames were dropped)
+        """
+        self.frames += steps
+        started_moving = False
+        if self.motion_gate is not None:
+            motion = self.motion_gate.check(frame)
+            # Only the change from static to moving detects early; while motion
+            # continues the tracker predicts between the regular detections
+            started_moving = motion and not self.moving
+            self.moving = motion
+        if self.frames_since_detection is not None:
+            self.frames_since_detection += steps
+            if self.frames_since_detection < self.detect_every and not started_moving:
+                return False
+        self.frames_since_detection = 0
+        self.detections += 1
+        return True
+
+    def get_stats(self):
+        return {
+            "frames": self.frames,
+            "detections": self.detections,
+            "detection_ratio": round(self.detections / self.frames, 3) if self.frames else 0.0,
+        }
@@ -0,0 +1,170 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.detections import Detections, box_iou
+from model.motion_gate import MotionGate
+from model.tracker import DetectionScheduler, IoUTracker, TRACK_ENDED, TRACK_STARTED
+
+NAMES = {0: "person", 1: "box"}
+
+
+def detections(boxes, class_ids=None):
+    """Detector output for ``boxes`` (xyxy), all with confidence 0.9."""
+    xyxy = np.array(boxes, dtype=np.float32).reshape(-1, 4)
+    class_ids = class_ids if class_ids is not None else [0] * len(xyxy)
+    return Detections(xyxy, np.full(len(xyxy), 0.9, np.float32), np.array(class_ids, np.int32), NAMES)
+
+
+def scene(box, size=(240, 320)):
+    """Gray frame with a white 40 px square at ``box`` (xyxy)."""
+    frame = np.full(size + (3,), 80, dtype=np.uint8)
+    x1, y1, x2, y2 = (int(v) for v in box)
+    frame[y1:y2, x1:x2] = 255
+    return frame
+
+
+def run(tracker, scheduler, frames, truth):
+    """Feed frames through the scheduler/tracker like YOLOThread does; returns tracked outputs."""
+    outputs = []
+    for frame, box in zip(frames, truth):
+        if scheduler.should_detect(frame):
+            outputs.append(tracker.update(detections([box]), 1, scheduler.moving))
+        else:
+            outputs.append(tracker.predict(1, scheduler.moving))
+    return outputs
+
+
+class IoUTrackerTest(unittest.TestCase):
+
+    def test_ids_stay_stable_between_detections(self):
+        tracker = IoUTracker(min_hits=1)
+        first = tracker.update(detections([[10, 10, 50, 50], [200, 100, 240, 140]]))
+        second = tracker.update(detections([[214, 100, 254, 140], [14, 10, 54, 50]]))
+        self.assertEqual(sorted(first.track_id.tolist()), [1, 2])
+        # Same objects, listed in the other order
+        self.assertEqual(second.track_id.tolist(), [1, 2])
+        self.assertGreater(second[second.track_id == 1].xyxy[0, 0], 10)
+
+    def test_classes_are_not_matched_with_each_other(self):
+        tracker = IoUTracker(min_hits=1)
+        tracker.update(detections([[10, 10, 50, 50]], [0]))
+        output = tracker.update(detections([[10, 10, 50, 50]], [1]))
+        self.assertEqual(output.track_id.tolist(), [2])
+
+    def test_start_and_end_events(self):
+        events = []
+        tracker = IoUTracker(min_hits=2, max_misses=2, on_event=events.append)
+        tracker.update(detections([[10, 10, 50, 50]]))
+        self.assertEqual(events, [])
+        tracker.update(detections([[12, 10, 52, 50]]))
+        self.assertEqual([event.kind for event in events], [TRACK_STARTED])
+
+        for _ in range(3):
+            tracker.update(detections([]))
+        self.assertEqual([event.kind for event in events], [TRACK_STARTED, TRACK_ENDED])
+        self.assertEqual(tracker.tracks, [])
+        self.assertEqual(events[1].to_dict()["track_id"], 1)
+
+    def test_unconfirmed_tracks_end_silently(self):
+        events = []
+        tracker = IoUTracker(min_hits=2, max_misses=1, on_event=events.append)
+        tracker.update(detections([[10, 10, 50, 50]]))
+        tracker.update(detections([]))
+        tracker.update(detections([]))
+        self.assertEqual(events, [])
+        self.assertEqual(tracker.tracks, [])
+
+    def test_boxes_follow_moving_objects_between_detections(self):
+        # Two objects, detector every 5th frame with 1.5 px corner jitter
+        frames = 100
+        truth_a = [[20 + 4 * i, 40, 80 + 4 * i, 100] for i in range(frames)]
+        truth_b = [[600 - 3 * i, 200 + 2 * i, 660 - 3 * i, 260 + 2 * i] for i in range(frames)]
+        rng = np.random.default_rng(0)
+        tracker = IoUTracker(min_hits=2)
+        scheduler = DetectionScheduler(detect_every=5)
+
+        ious = []
+        ids = {}
+        for i in range(frames):
+            if scheduler.should_detect(None):
+                boxes = np.array([truth_a[i], truth_b[i]], np.float32) + rng.normal(0, 1.5, (2, 4))
+                output = tracker.update(detections(boxes))
+            else:
+                output = tracker.predict()
+            if i < 10:
+                continue  # Let the filters learn the velocities
+            self.assertEqual(len(output), 2)
+            overlaps = box_iou(output.xyxy, [truth_a[i], truth_b[i]])
+            for row, track_id in enumerate(output.track_id.tolist()):
+                column = int(overlaps[row].argmax())
+                ids.setdefault(column, track_id)
+                self.assertEqual(ids[column], track_id, "track id changed")
+                ious.append(overlaps[row, column])
+
+        self.assertEqual(scheduler.get_stats()["detection_ratio"], 0.2)
+        self.assertGreaterEqual(float(np.mean(ious)), 0.9)
+
+
+class DetectionSchedulerTest(unittest.TestCase):
+
+    def test_detects_every_n_frames(self):
+        scheduler = DetectionScheduler(detect_every=5)
+        detected = [index for index in range(20) if scheduler.should_detect(None)]
+        self.assertEqual(detected, [0, 5, 10, 15])
+
+    def test_dropped_frames_count_towards_the_interval(self):
+        scheduler = DetectionScheduler(detect_every=5)
+        scheduler.should_detect(None)
+        self.assertFalse(scheduler.should_detect(None, steps=2))
+        self.assertTrue(scheduler.should_detect(None, steps=3))
+        self.assertEqual(scheduler.get_stats()["frames"], 6)
+
+    def test_motion_starting_detects_early(self):
+        scheduler = DetectionScheduler(detect_every=5, motion_gate=MotionGate(max_skip_seconds=None))
+        self.assertTrue(scheduler.should_detect(scene([10, 10, 50, 50])))
+        self.assertFalse(scheduler.should_detect(scene([10, 10, 50, 50])))
+        self.assertFalse(scheduler.moving)
+        self.assertTrue(scheduler.should_detect(scene([30, 10, 70, 50])))
+        self.assertTrue(scheduler.moving)
+
+    def test_continued_motion_keeps_the_interval(self):
+        scheduler = DetectionScheduler(detect_every=5, motion_gate=MotionGate(max_skip_seconds=None))
+        frames = [scene([10 + 4 * index, 10, 50 + 4 * index, 50]) for index in range(20)]
+        detected = [index for index, frame in enumerate(frames) if scheduler.should_detect(frame)]
+        self.assertEqual(detected, [0, 5, 10, 15])
+        self.assertTrue(scheduler.moving)
+
+    def test_static_scene_still_detects_every_n_frames(self):
+        scheduler = DetectionScheduler(detect_every=5, motion_gate=MotionGate(max_skip_seconds=None))
+        frame = scene([10, 10, 50, 50])
+        detected = [index for index in range(20) if scheduler.should_detect(frame)]
+        self.assertEqual(detected, [0, 5, 10, 15])
+        self.assertFalse(scheduler.moving)
+
+    def test_stopped_object_does_not_drift(self):
+        # Moves 4 px per frame from x=110, stops at x=170 after 15 frames, then stays for 45.
+        # Detecting only every 5th frame and predicting with the last velocity, the box
+        # used to drift to x=193, 232, 286 and 340 at the offsets checked below
+        truth = [[min(110 + 4 * i, 170), 100, min(110 + 4 * i, 170) + 40, 140] for i in range(60)]
+        frames = [scene(box) for box in truth]
+        tracker = IoUTracker(min_hits=1)
+        scheduler = DetectionScheduler(detect_every=5, motion_gate=MotionGate(max_skip_seconds=None))
+
+        outputs = run(tracker, scheduler, frames, truth)
+
+        stopped = 15
+        for offset in (6, 16, 30, 44):
+            output = outputs[stopped + offset]
+            self.assertEqual(output.track_id.tolist(), [1])
+            self.assertAlmostEqual(float(output.xyxy[0, 0]), 170, delta=2,
+                                   msg=f"box drifted {offset} frames after the object stopped")
+        # The detector ran every 5th frame throughout, moving or not (0, 5, ... 55)
+        self.assertEqual(scheduler.get_stats()["detections"], 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
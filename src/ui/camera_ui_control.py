@@ -1,18 +1,36 @@
 from PySide6.QtWidgets import QWidget, QListWidgetItem, QMessageBox, QFileDialog
-from PySide6.QtGui import QIcon
+from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtGui import QIcon, QImage, QPixmap
 from ui.camera_design import Ui_Form
 from ui.camera_dialog import CameraDialog
 from camera.cam_handler import CameraThread
-from camera.check_ping import PingThread
+from camera.process_backend import ProcessCameraThread
+from camera.snapshot_backend import SnapshotCameraThread
+from camera.check_ping import PingThread, ProbeTarget
+from camera.health_monitor import HealthMonitor, StatusCoalescer
+from camera.stall_watchdog import StallWatchdog
 from camera.camera_configuration_manager import CameraConfigManager
+from camera.capture_writer import get_capture_writer, load_writer_settings
+from camera.trigger_metrics import get_trigger_metrics
+from model.inference_service import MODEL_READY, MODEL_FAILED, get_inference_service, load_inference_settings
 from datetime import datetime
 import os
 import time
 import json
 
+SHUTDOWN_TIMEOUT = 5.0  # Seconds to wait for threads on close before giving up on them
+MAX_STUCK_RESTARTS = 2  # Replaced threads per camera that may still be stuck before restarts stop
+
 class CameraWidget(QWidget):
     """Main widget for camera management and display."""
     
+    # Display frames delivered from the camera thread (image, camera_name)
+    display_frame_signal = Signal(QImage, str)
+    # Emitted when shutdown() has stopped every thread and flushed outputs
+    shutdown_finished = Signal()
+    # (status, message) of the shared inference model while it loads in the background
+    model_status_signal = Signal(str, str)
+    
     """ Initialize and set configuration """
     def __init__(self):
         super().__init__()
@@ -26,18 +44,57 @@ class CameraWidget(QWidget):
         self.current_camera = None  # Track which camera is currently displayed
         self.displaying = False  # Track if we're currently displaying any camera
         self.trigger_results = {}  # Store results from triggers
+        self.detection_results = {}  # Latest AIResult per camera
         self.ping_threads = []  # Store ping threads to prevent garbage collection
+        self.display_subscription = None  # Frame subscription of the displayed camera
+        self.camera_health = {}  # Latest health summary per camera
+        self.stopping_threads = {}  # Threads told to stop that haven't finished yet -> camera_name
+        self.stop_total = 0  # Threads in the current stop-all batch (progress reporting)
+        self.abandoned_threads = {}  # Stuck threads no longer waited for -> camera_name (kept alive)
+        self.shutdown_deadline = None  # time.monotonic() after which shutdown stops waiting
+        self.shutting_down = False
+        self.shut_down = False
         
         # Initialize config manager
         self.config_manager = CameraConfigManager()
         
+        # Create the shared capture writer with its settings file before any camera uses it
+        get_capture_writer(**load_writer_settings())
+        
         # Define icon paths
         self.icon_offline = "src/asset/images/red.png"
         self.icon_online = "src/asset/images/green.png"
         self.icon_connecting = "src/asset/images/yellow.png"
+        self.icon_unreachable = "src/asset/images/icons8-error-48.png"
+        
+        # Load each icon once; status updates only swap these
+        self.icons = {
+            "connecting": QIcon(self.icon_connecting),
+            "reconnecting": QIcon(self.icon_connecting),
+            "connected": QIcon(self.icon_online),
+            "disconnected": QIcon(self.icon_offline),
+            "reachable": QIcon(self.icon_offline),
+            "unreachable": QIcon(self.icon_unreachable),
+        }
+        
+        # Status changes are batched and applied to the list a few times per second
+        self.status_coalescer = StatusCoalescer(parent=self, is_streaming=self._is_streaming)
+        self.health_monitor = HealthMonitor(stats_provider=self._stream_stats)
+        self.stall_watchdog = StallWatchdog(parent=self)
+        
+        # Re-checks shutdown progress for threads without a finished handler
+        self.shutdown_timer = QTimer(self)
+        self.shutdown_timer.setInterval(100)
+        self.shutdown_timer.timeout.connect(self._check_shutdown)
         
         self._setup_ui()
         self.load_saved_cameras()
+        self.connect_all_cameras()
+        self.health_monitor.set_targets(self.camera_properties)
+        self.health_monitor.start()
+        
+        # Load the AI model once the window is up, so startup never waits for it
+        QTimer.singleShot(0, self.start_inference_service)
     
     def _setup_ui(self):
         """Connect UI elements to their handlers."""
@@ -50,6 +107,18 @@ class CameraWidget(QWidget):
         self.ui.detect.clicked.connect(self.run_ai_model)
         self.ui.listWidget.itemClicked.connect(self.select_camera)
         self.ui.remove_cam.clicked.connect(self.remove_camera)
+        self.display_frame_signal.connect(self._handle_new_frame)
+        self.model_status_signal.connect(self._handle_model_status)
+        self.status_coalescer.flushed.connect(self._apply_status_batch)
+        self.health_monitor.status_batch_signal.connect(self.status_coalescer.push_many)
+        self.health_monitor.health_signal.connect(self._handle_health)
+        self.stall_watchdog.stall_signal.connect(
+            lambda cam, kind, details: self.log_message(f"🐢 {cam} stalled ({details})")
+        )
+        self.stall_watchdog.recovered_signal.connect(
+            lambda cam, duration: self.log_message(f"✅ {cam} recovered after {duration:.1f}s")
+        )
+        self.stall_watchdog.restart_signal.connect(self._restart_camera)
     
     def load_saved_cameras(self):
         """Load saved camera configurations from file"""
@@ -64,11 +133,17 @@ class CameraWidget(QWidget):
                 camera["camera_name"] = camera_name
                 
             # Add with offline icon (cameras start offline)
-            item = QListWidgetItem(QIcon(self.icon_offline), camera_name)
+            item = QListWidgetItem(self.icons["disconnected"], camera_name)
             self.ui.listWidget.addItem(item)
             
             # Store camera properties (without status)
             self.camera_properties[camera_name] = camera
+
+    def connect_all_cameras(self):
+        """Start every camera marked auto_connect; each thread connects in parallel."""
+        for camera_name, camera_props in self.camera_properties.items():
+            if camera_props["auto_connect"]:
+                self.start_camera(camera_name)
     
     """ User Interface Management """
     def log_message(self, message):
@@ -153,11 +228,13 @@ class CameraWidget(QWidget):
         # Set this as the current camera to display
         self.current_camera = camera_name
         self.displaying = True
+        self._subscribe_display(camera_name)
         self.ui.display.setText("HIDE")
         print(f"🖥️ Now displaying {camera_name}")
     
     def _clear_display(self):
         """Helper method to clear the display and reset display state."""
+        self._unsubscribe_display()
         self.ui.label.clear()
         self.current_camera = None
         self.displaying = False
@@ -170,7 +247,7 @@ class CameraWidget(QWidget):
         if not dialog.exec():  # If user cancels
             return
             
-        camera_info = dialog.get_camera_info()
+        camera_info = self.config_manager.apply_defaults(dialog.get_camera_info())
         ip_address = camera_info["ip_address"]
         
         # Generate default name if empty
@@ -180,7 +257,7 @@ class CameraWidget(QWidget):
             camera_info["camera_name"] = camera_name
         
         # Add item with connecting icon
-        item = QListWidgetItem(QIcon(self.icon_connecting), camera_name)
+        item = QListWidgetItem(self.icons["connecting"], camera_name)
         self.ui.listWidget.addItem(item)
         
         # Store camera properties without status
@@ -188,56 +265,53 @@ class CameraWidget(QWidget):
 
         print(f"🔍 Checking connection to {ip_address}...")
 
-        # Ping the camera
-        ping_thread = PingThread(ip_address)
+        # Probe the camera's port (TCP connect, non-blocking)
+        ping_thread = PingThread(ProbeTarget(
+            ip_address, camera_info["port"], camera_info["protocol"], key=camera_name
+        ))
         ping_thread.result_signal.connect(self._handle_ping_result)
+        ping_thread.finished.connect(self._cleanup_ping_threads)
         self.ping_threads.append(ping_thread)
         ping_thread.start()
  
-    def _handle_ping_result(self, camera_ip, is_reachable):
-        """Handle result of ping test."""
-        # Find the camera in our list that matches this IP
-        found_camera = None
+    def _handle_ping_result(self, camera_name, is_reachable, message):
+        """Handle result of the reachability probe."""
+        camera_ip = self.camera_properties.get(camera_name, {}).get("ip_address")
+        
+        # Find the camera in our list
         found_item = None
         found_index = -1
-        
-        # Search for camera with this IP in our properties
         for i in range(self.ui.listWidget.count()):
             item = self.ui.listWidget.item(i)
-            camera_name = item.text()
-            props = self.camera_properties.get(camera_name)
-            
-            if props and props["ip_address"] == camera_ip:
-                found_camera = camera_name
+            if item.text() == camera_name:
                 found_item = item
                 found_index = i
                 break
         
-        if not found_camera or not found_item:
-            print(f"⚠️ Could not find camera with IP {camera_ip} in the list!")
+        if camera_ip is None or not found_item:
+            print(f"⚠️ Could not find camera {camera_name} in the list!")
             return
             
         if is_reachable:
             # Update to offline icon initially (will update when connected)
-            found_item.setIcon(QIcon(self.icon_offline))
+            found_item.setIcon(self.icons["disconnected"])
             
-            # Save to config
-            self.config_manager.add_camera(self.camera_properties[found_camera])
-            print(f"✅ Camera {found_camera} is reachable at {camera_ip}")
+            # Save to config and start monitoring it
+            self.config_manager.add_camera(self.camera_properties[camera_name])
+            self.health_monitor.set_targets(self.camera_properties)
+            print(f"✅ Camera {camera_name} is reachable at {camera_ip} ({message})")
         else:
             # Remove the camera from the list since it's unreachable
             self.ui.listWidget.takeItem(found_index)
             
             # Remove from properties dictionary
-            if found_camera in self.camera_properties:
-                del self.camera_properties[found_camera]
+            del self.camera_properties[camera_name]
                 
-            print(f"❌ Camera {found_camera} at {camera_ip} is unreachable! Camera removed.")
-            
-        # Clean up the ping thread
-        for i, thread in enumerate(self.ping_threads):
-            if not thread.isRunning():
-                self.ping_threads.pop(i)
+            print(f"❌ Camera {camera_name} at {camera_ip} is unreachable ({message})! Camera removed.")
+    
+    def _cleanup_ping_threads(self):
+        """Drop finished probe threads."""
+        self.ping_threads = [thread for thread in self.ping_threads if thread.isRunning()]
     
     def remove_camera(self):
         """Remove the selected camera from the list and configuration."""
@@ -283,6 +357,8 @@ class CameraWidget(QWidget):
         # Remove from our properties dictionary
         if camera_name in self.camera_properties:
             del self.camera_properties[camera_name]
+        self.health_monitor.set_targets(self.camera_properties)
+        self.status_coalescer.forget(camera_name)
                 
         # Remove from configuration manager
         success = self.config_manager.remove_camera_by_name(camera_name)
@@ -297,75 +373,114 @@ class CameraWidget(QWidget):
             self._clear_display()
 
     def _update_camera_icon(self, camera_name, status):
-        """Update the camera icon based on status."""
-        icon_map = {
-            "connecting": self.icon_connecting,
-            "connected": self.icon_online,
-            "disconnected": self.icon_offline
-        }
-        
-        if status not in icon_map:
-            return
-            
-        # Update icon in list
+        """Queue an icon update; it is applied with the next status batch."""
+        if status in self.icons:
+            self.status_coalescer.push(camera_name, status)
+
+    def _apply_status_batch(self, statuses):
+        """Apply coalesced status changes to the camera list in one pass."""
+        items = {}
         for i in range(self.ui.listWidget.count()):
             item = self.ui.listWidget.item(i)
-            if item.text() == camera_name:
-                item.setIcon(QIcon(icon_map[status]))
-                break
+            items[item.text()] = item
+        
+        for camera_name, status in statuses.items():
+            item = items.get(camera_name)
+            if item is None:
+                continue
+            item.setIcon(self.icons[status])
+    
+    def _is_streaming(self, camera_name):
+        """While a camera's thread runs, its own connection status wins over probe results."""
+        thread = self.camera_threads.get(camera_name)
+        return thread is not None and thread.isRunning()
 
     def _update_camera_status(self, camera_name, status):
         """Update the camera icon only."""
         # Just update the icon
         self._update_camera_icon(camera_name, status)
     
-    def _handle_camera_stopped(self, camera_name):
-        """Handle when a camera thread stops by itself (due to disconnection)"""
-        if camera_name not in self.camera_threads:
-            return
-            
-        # Ensure thread is fully finished
-        try:
-            if self.camera_threads[camera_name].isRunning():
-                self.camera_threads[camera_name].wait(1000)  # Wait with timeout
-        except RuntimeError:
-            pass  # Thread might already be finished
-            
-        # Remove the thread reference
-        del self.camera_threads[camera_name]
-        
-        # Update the icon
-        self._update_camera_icon(camera_name, "disconnected")
+    def _handle_health(self, health):
+        """Keep the latest health summaries (probe RTT, fps, errors) per camera."""
+        self.camera_health = health
+    
+    def _stream_stats(self):
+        """Stream stats of running cameras (called from the health monitor thread)."""
+        return {
+            camera_name: thread.get_stats()
+            for camera_name, thread in list(self.camera_threads.items())
+            if thread.isRunning()
+        }
+    
+    def closeEvent(self, event):
+        """Stop all cameras in the background and close once they have finished."""
+        if self.shutdown():
+            event.accept()
+        else:
+            self.shutdown_finished.connect(self.close, Qt.UniqueConnection)
+            event.ignore()
+    
+    def shutdown(self):
+        """
+        Stop every camera at once without blocking the UI, then flush outputs.
         
-        # Clear the display if this was the current camera being displayed
-        if self.displaying and self.current_camera == camera_name:
-            self._clear_display()
-                
-        print(f"🛑 Camera {camera_name} stopped due to disconnection")
+        Returns:
+            bool: True when everything is already stopped (safe to close now);
+            otherwise shutdown_finished is emitted once the last thread ends, or
+            after SHUTDOWN_TIMEOUT with the stuck threads left behind
+        """
+        if self.shut_down:
+            return True
+        if not self.shutting_down:
+            self.shutting_down = True
+            self.stop_all_cameras()
+            self.health_monitor.stop()
+        
+        pending = self._pending_threads()
+        if pending:
+            if self.shutdown_deadline is None:
+                self.shutdown_deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+            if time.monotonic() < self.shutdown_deadline:
+                if not self.shutdown_timer.isActive():
+                    self.shutdown_timer.start()
+                return False
+            
+            # A thread stuck in a blocking call must not keep the window open forever
+            print(f"⚠️ Gave up waiting after {SHUTDOWN_TIMEOUT:.0f}s for: {', '.join(pending)}")
+            self.abandoned_threads.update(self.stopping_threads)
+            self.stopping_threads.clear()
+            self.stop_total = 0
         
-        # The key improvement: Don't affect other cameras - just handle this one
+        self.shutdown_timer.stop()
+        self._finish_shutdown()
+        return True
     
-    def closeEvent(self, event):
-        """Ensure all camera threads stop when closing the window."""
-        # Create a copy of the keys to avoid modification during iteration
-        camera_names = list(self.camera_threads.keys())
-        for camera_name in camera_names:
-            self.stop_camera(camera_name)
+    def _pending_threads(self):
+        """Names of the threads shutdown is still waiting for."""
+        pending = list(self.stopping_threads.values())
+        if self.health_monitor.isRunning():
+            pending.append("health monitor")
+        pending += ["ping" for thread in self.ping_threads if thread.isRunning()]
+        return pending
+    
+    def _check_shutdown(self):
+        """Poll for threads without a finished handler (health monitor, probes)."""
+        if self.shutting_down and not self.shut_down and self.shutdown():
+            self.shutdown_finished.emit()
+    
+    def _finish_shutdown(self):
+        """Flush captures, metrics and configuration after all threads stopped."""
+        self.shut_down = True
+        
+        # Let queued captures reach the disk before exiting
+        get_capture_writer().flush()
+        self.export_trigger_metrics()
+        self.export_stall_events()
         
         # Save configuration on close
         self.config_manager.save_config()
+        print("👋 All cameras stopped")
         
-        # Also clean up ping threads
-        for thread in self.ping_threads:
-            if thread.isRunning():
-                try: 
-                    thread.terminate()
-                    thread.wait(500)
-                except Exception as e:
-                    print(f"⚠️ Error terminating ping thread: {str(e)}")
-                    pass
-                    
-        event.accept()
     """ Camera Operation """
     # Start Camera
     def start_camera(self, specific_camera=None):
@@ -393,21 +508,41 @@ class CameraWidget(QWidget):
         # Update icon to connecting
         self._update_camera_icon(camera_name, "connecting")
 
+        # Decode in a worker process or fetch snapshots when configured, otherwise stream in a QThread
+        backend_kwargs = {}
+        if camera_props["capture_backend"] == "process":
+            thread_class = ProcessCameraThread
+        elif camera_props["capture_backend"] == "snapshot":
+            thread_class = SnapshotCameraThread
+            backend_kwargs = {
+                "snapshot_path": camera_props["snapshot_path"],
+                "snapshot_budget_ms": camera_props["snapshot_budget_ms"],
+            }
+        else:
+            thread_class = CameraThread
+        
         # Start new camera thread with all properties
-        self.camera_threads[camera_name] = CameraThread(
+        self.camera_threads[camera_name] = thread_class(
             camera_props["ip_address"],
             camera_props["port"],
             camera_props["username"],
             camera_props["password"],
             camera_props["camera_name"],
             camera_props["protocol"],
+            target_fps=camera_props["target_fps"],
+            pacing=camera_props["pacing"],
+            decode_mode=camera_props["decode_mode"],
+            capture_sidecar=camera_props["capture_sidecar"],
+            history_seconds=camera_props["history_seconds"],
+            history_fps=camera_props["history_fps"],
+            auto_reconnect=camera_props["auto_reconnect"],
+            reconnect_max_delay=camera_props["reconnect_max_delay"],
+            rois=camera_props["rois"],
+            **backend_kwargs,
         )
         
         # Connect signals
         thread = self.camera_threads[camera_name]
-        thread.frame_signal.connect(
-            lambda pixmap, cam=camera_name: self._handle_new_frame(pixmap, cam)
-        )
         thread.log_signal.connect(self.log_message)
         thread.connection_status_signal.connect(
             lambda status, cam=camera_name: self._update_camera_status(cam, status)
@@ -415,6 +550,8 @@ class CameraWidget(QWidget):
         thread.trigger_completed_signal.connect(
             lambda result, cam=camera_name: self._handle_trigger_result(result, cam)
         )
+        thread.trigger_timing_signal.connect(self._handle_trigger_timing)
+        thread.detection_signal.connect(self._handle_detection_result)
         
         # Handle thread finished signal to clean up properly
         thread.finished.connect(
@@ -422,17 +559,80 @@ class CameraWidget(QWidget):
         )
         
         thread.start()
+        self.stall_watchdog.watch(
+            camera_name, thread, camera_props["stall_timeout"], camera_props["min_fps"]
+        )
         print(f"✅ Started streaming {camera_name}")
 
-    def _handle_new_frame(self, pixmap, camera_name):
-        """Handle incoming frames from camera threads."""
+    def _restart_camera(self, camera_name):
+        """
+        Replace a camera thread that is stuck in a blocking read with a fresh one.
+        
+        The old thread can't be joined, so it is abandoned: it ends by itself once
+        the read returns. Every abandoned thread may still hold a connection to the
+        camera, so restarts stop while MAX_STUCK_RESTARTS of them are alive.
+        """
+        thread = self.camera_threads.get(camera_name)
+        if thread is None or self.shutting_down:
+            return
+        stuck = sum(1 for cam in self.abandoned_threads.values() if cam == camera_name)
+        if stuck >= MAX_STUCK_RESTARTS:
+            self.log_message(f"⛔ Not restarting {camera_name}: {stuck} earlier threads are still stuck")
+            return
+        
+        self.log_message(f"♻️ Restarting {camera_name}: capture did not respond to reconnect")
+        self.stop_camera(camera_name)
+        # Don't let the stuck thread hold up closing the app
+        if self.stopping_threads.pop(thread, None) is not None:
+            self.abandoned_threads[thread] = camera_name
+        self.start_camera(camera_name)
+
+    def _subscribe_display(self, camera_name):
+        """Subscribe the display label to a camera at the label's size."""
+        self._unsubscribe_display()
+        thread = self.camera_threads.get(camera_name)
+        if thread is None:
+            return
+        
+        size = (self.ui.label.width(), self.ui.label.height())
+        self.display_subscription = (camera_name, thread.subscribe(
+            "display",
+            lambda frame, sequence, timestamp, cam=camera_name: self._emit_display_frame(frame, cam),
+            size=size,
+            pixel_format="RGB",
+            max_fps=30,
+        ))
+    
+    def _unsubscribe_display(self):
+        """Drop the display subscription, if any."""
+        if self.display_subscription is None:
+            return
+        camera_name, subscription = self.display_subscription
+        thread = self.camera_threads.get(camera_name)
+        if thread is not None:
+            thread.unsubscribe(subscription)
+        self.display_subscription = None
+    
+    def _emit_display_frame(self, rgb_frame, camera_name):
+        """Wrap an RGB frame in a QImage on the camera thread and queue it to the UI."""
+        h, w, ch = rgb_frame.shape
+        qt_image = QImage(rgb_frame.data, w, h, ch * w, QImage.Format_RGB888).copy()
+        self.display_frame_signal.emit(qt_image, camera_name)
+    
+    def _handle_new_frame(self, qt_image, camera_name):
+        """Handle incoming display frames from camera threads."""
         # Only update the display if this is the current camera AND display is enabled
         if self.displaying and camera_name == self.current_camera:
-            self.ui.label.setPixmap(pixmap)
+            self.ui.label.setPixmap(QPixmap.fromImage(qt_image))
         
     # Stop Camera        
     def stop_camera(self, specific_camera=None):
-        """Stop streaming for the selected or specified camera with proper isolation."""
+        """
+        Stop streaming for the selected or specified camera without blocking the UI.
+        
+        The thread is told to stop and forgotten by the widget right away; it is
+        released when its finished signal arrives.
+        """
         # If a specific camera was provided, use it, otherwise get from selection
         camera_name = specific_camera
         if not camera_name:
@@ -447,12 +647,9 @@ class CameraWidget(QWidget):
             print(f"ℹ️ No active stream for {camera_name}")
             return False
             
-        # Get the thread reference
-        thread = self.camera_threads[camera_name]
-        
-        # Make a copy of the thread reference before removal
-        # to prevent affecting dictionary during operations
-        thread_ref = thread
+        # Remove the thread from our dictionary first so nothing else uses it
+        thread = self.camera_threads.pop(camera_name)
+        self.stall_watchdog.unwatch(camera_name)
         
         try:
             print(f"🛑 Stopping {camera_name}...")
@@ -460,59 +657,73 @@ class CameraWidget(QWidget):
             # Disconnect all signals from this thread first to prevent conflicts
             # Use try/except since some signals may not be connected
             try:
-                thread_ref.frame_signal.disconnect()
-                thread_ref.log_signal.disconnect()
-                thread_ref.connection_status_signal.disconnect()
-                thread_ref.trigger_completed_signal.disconnect()
-                thread_ref.finished.disconnect()
-            except TypeError:
+                thread.log_signal.disconnect()
+                thread.connection_status_signal.disconnect()
+                thread.trigger_completed_signal.disconnect()
+                thread.trigger_timing_signal.disconnect()
+                thread.detection_signal.disconnect()
+                thread.finished.disconnect()
+            except (TypeError, RuntimeError):
                 # It's okay if some signals were not connected
                 pass
                 
-            # Now stop the thread's operation
-            thread_ref.stop()
+            # Keep a reference until the thread has really ended (connected before
+            # stop() so a thread that ends right away can't be missed)
+            self.stopping_threads[thread] = camera_name
+            thread.finished.connect(
+                lambda cam=camera_name, thread=thread: self._handle_thread_stopped(cam, thread)
+            )
             
-            # Update icon to offline before waiting (for UI responsiveness)
+            # Now stop the thread's operation (returns immediately)
+            thread.stop()
+            
+            # Update icon to offline right away (for UI responsiveness)
             self._update_camera_icon(camera_name, "disconnected")
             
             # Clear the display if this was the current camera being displayed
             if self.displaying and self.current_camera == camera_name:
                 self._clear_display()
-                
-            # Remove the thread from our dictionary BEFORE waiting
-            # This ensures other code won't try to use this thread anymore
-            del self.camera_threads[camera_name]
-            
-            # Wait for the thread to finish, with a reasonable timeout
-            if thread_ref.isRunning():
-                print(f"⏱️ Waiting for {camera_name} thread to finish...")
-                success = thread_ref.wait(2000)  # Wait up to 2 seconds
-                if not success:
-                    print(f"⚠️ Thread for {camera_name} didn't stop properly, forcing termination")
-                    thread_ref.terminate()  # Force termination as a last resort
-                    thread_ref.wait(500)   # Give it a moment to clean up
-            
-            print(f"✅ Successfully stopped {camera_name}")
+            
+            if not thread.isRunning():
+                self._handle_thread_stopped(camera_name, thread)
             return True
             
         except Exception as e:
             print(f"❌ Error stopping {camera_name}: {str(e)}")
-            # Still try to remove from dictionary if there was an error
-            if camera_name in self.camera_threads:
-                del self.camera_threads[camera_name]
             return False
-   
+    
+    def stop_all_cameras(self):
+        """Signal every camera to stop at once; they shut down concurrently."""
+        camera_names = list(self.camera_threads.keys())
+        self.stop_total = len(camera_names) + len(self.stopping_threads)
+        if self.stop_total:
+            print(f"⏳ Waiting for {self.stop_total} camera(s) to stop...")
+        for camera_name in camera_names:
+            self.stop_camera(camera_name)
+    
+    def _handle_thread_stopped(self, camera_name, thread):
+        """A thread told to stop has ended (runs on the UI thread)."""
+        if self.abandoned_threads.pop(thread, None) is not None:
+            print(f"✅ Stuck thread of {camera_name} has ended")
+            return
+        if self.stopping_threads.pop(thread, None) is None:
+            return
+        print(f"✅ Successfully stopped {camera_name}")
+        if self.stop_total:
+            print(f"⏳ Stopped {self.stop_total - len(self.stopping_threads)}/{self.stop_total} cameras")
+        if not self.stopping_threads:
+            self.stop_total = 0
+        if self.shutting_down:
+            self._check_shutdown()
    
     def _handle_camera_stopped(self, camera_name):
         """Handle when a camera thread stops by itself (due to disconnection or error)"""
         if camera_name not in self.camera_threads:
             return
             
-        # Store a reference to the thread
-        thread = self.camera_threads[camera_name]
-        
-        # Remove the thread reference FIRST to prevent other code from using it
+        # The thread has already finished; just drop our reference
         del self.camera_threads[camera_name]
+        self.stall_watchdog.unwatch(camera_name)
         
         # Update the icon
         self._update_camera_icon(camera_name, "disconnected")
@@ -520,21 +731,6 @@ class CameraWidget(QWidget):
         # Clear the display if this was the current camera being displayed
         if self.displaying and self.current_camera == camera_name:
             self._clear_display()
-                
-        # Ensure thread is fully finished without blocking the UI
-        try:
-            if thread.isRunning():
-                # Use a short timeout to avoid blocking UI
-                thread.wait(500)  
-                
-                # If it's still running after timeout, we'll terminate it
-                if thread.isRunning():
-                    print(f"⚠️ Force terminating {camera_name} thread")
-                    thread.terminate()
-        except RuntimeError as e:
-            print(f"⚠️ Runtime error cleaning up {camera_name} thread: {str(e)}")
-        except Exception as e:
-            print(f"⚠️ Error cleaning up {camera_name} thread: {str(e)}")
             
         print(f"🛑 Camera {camera_name} stopped")
     
@@ -555,6 +751,51 @@ class CameraWidget(QWidget):
         # Store the result in trigger_results dictionary
         self.trigger_results[camera_name] = result
 
+    def _handle_detection_result(self, result, camera_name):
+        """
+        Handle the structured result of an AI trigger.
+        
+        Args:
+            result (AIResult): Detections, timings and annotated image path
+            camera_name (str): Name of the camera that was triggered
+        """
+        self.detection_results[camera_name] = result
+        labels = ", ".join(result.detections.labels()) or "no detections"
+        print(f"🧠 {camera_name} ({result.trigger_id}): {labels} -> {result.image_path}")
+
+    def _handle_trigger_timing(self, record, camera_name):
+        """Close a trigger's timing record and show its latency next to the camera's percentiles."""
+        record.mark("notified")
+        metrics = get_trigger_metrics()
+        durations = metrics.complete(record)
+        total = metrics.summary(camera_name).get("total", {})
+        
+        stages = ", ".join(
+            f"{stage} {durations[stage]:.1f}" for stage in ("acquired", "inferred", "dequeued", "encoded", "written", "notified")
+            if stage in durations
+        )
+        self.log_message(
+            f"⏱️ {record.trigger_id} {durations['total']:.1f} ms ({stages}) | "
+            f"p50 {total['p50']:.1f} / p95 {total['p95']:.1f} / p99 {total['p99']:.1f} ms over {total['count']}"
+        )
+    
+    def export_trigger_metrics(self):
+        """Dump trigger latency histograms to 'outputs/metrics'."""
+        metrics = get_trigger_metrics()
+        if not metrics.summary():
+            return None
+        filename = metrics.dump()
+        print(f"Trigger latency exported to {filename}")
+        return filename
+
+    def export_stall_events(self):
+        """Dump recorded stream stalls to 'outputs/metrics'."""
+        if not self.stall_watchdog.events:
+            return None
+        filename = self.stall_watchdog.dump()
+        print(f"Stall events exported to {filename}")
+        return filename
+
     def trigger_http(self):
         """Trigger cameras independently based on JSON configuration with improved isolation."""
         json_path, _ = QFileDialog.getOpenFileName(
@@ -571,6 +812,7 @@ class CameraWidget(QWidget):
         try:
             with open(json_path, 'r', encoding='utf-8') as f:
                 trigger_configs = json.load(f)
+            received_at = time.time()
             
             triggered_cameras = []
             failed_cameras = []
@@ -601,12 +843,22 @@ class CameraWidget(QWidget):
                         skipped_cameras.append(camera_name)
                         continue
                     
-                    # Attempt to trigger
-                    result = thread.trigger(trigger_type)
+                    # Entries with offset_ms/frames_before/frames_after capture from the
+                    # pre-trigger history, compensating for late trigger signals
+                    if trigger_type == "capture" and any(
+                        key in config for key in ("offset_ms", "frames_before", "frames_after")
+                    ):
+                        result = thread.trigger_at(
+                            received_at - config.get("offset_ms", 0) / 1000,
+                            config.get("frames_before", 0),
+                            config.get("frames_after", 0),
+                        )
+                    else:
+                        result = thread.trigger(trigger_type)
                     
                     if result:
                         triggered_cameras.append(camera_name)
-                        print(f"✅ Triggered {camera_name}")
+                        print(f"✅ Triggered {camera_name} ({result})")
                     else:
                         failed_cameras.append(camera_name)
                         print(f"❌ Failed to trigger {camera_name}")
@@ -633,6 +885,27 @@ class CameraWidget(QWidget):
         except Exception as e:
             print(f"❌ Unexpected error in trigger_http: {str(e)}")
             
+    def start_inference_service(self):
+        """Create the shared inference service; its model loads on its own thread."""
+        service = get_inference_service(**load_inference_settings())
+        service.add_status_listener(self.model_status_signal.emit)
+
+    def _handle_model_status(self, status, message):
+        """
+        Show the loading state of the AI model.
+        
+        Args:
+            status (str): "loading", "ready" or "failed"
+            message (str): Current loading step, model name or error
+        """
+        self.ui.detect.setToolTip(f"AI model {status}: {message}")
+        if status == MODEL_READY:
+            print(f"🧠 AI model ready: {message}")
+        elif status == MODEL_FAILED:
+            print(f"❌ {message}")
+        else:
+            print(f"⏳ AI model loading: {message}")
+
     def run_ai_model(self):    
         """Trigger cameras independently based on JSON configuration with improved isolation."""
         json_path, _ = QFileDialog.getOpenFileName(
@@ -683,7 +956,7 @@ class CameraWidget(QWidget):
                     
                     if result:
                         triggered_cameras.append(camera_name)
-                        print(f"✅ Triggered {camera_name}")
+                        print(f"✅ Triggered {camera_name} ({result})")
                     else:
                         failed_cameras.append(camera_name)
                         print(f"❌ Failed to trigger {camera_name}")
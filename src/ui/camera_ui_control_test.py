@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QThread, QTimer
+from PySide6.QtWidgets import QApplication, QWidget
+
+from ui.camera_ui_control import CameraWidget
+
+
+class StuckThread(QThread):
+    """Stands in for a camera thread blocked inside a capture read."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def run(self):
+        self.release.wait()
+
+
+def shutdown_widget():
+    """A CameraWidget with only the state shutdown() uses (no cameras, config or UI)."""
+    widget = CameraWidget.__new__(CameraWidget)
+    QWidget.__init__(widget)
+    widget.camera_threads = {}
+    widget.stopping_threads = {}
+    widget.abandoned_threads = {}
+    widget.stop_total = 0
+    widget.ping_threads = []
+    widget.shutting_down = False
+    widget.shut_down = False
+    widget.shutdown_deadline = None
+    widget.health_monitor = mock.Mock(**{"isRunning.return_value": False})
+    widget.shutdown_timer = QTimer(widget)
+    widget._finish_shutdown = mock.Mock(side_effect=lambda: setattr(widget, "shut_down", True))
+    return widget
+
+
+class ShutdownTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.thread = StuckThread()
+        self.thread.start()
+
+    def tearDown(self):
+        self.thread.release.set()
+        self.thread.wait()
+
+    def test_finishes_right_away_without_threads(self):
+        widget = shutdown_widget()
+        self.assertTrue(widget.shutdown())
+        widget._finish_shutdown.assert_called_once()
+
+    def test_stuck_thread_is_abandoned_at_the_deadline(self):
+        widget = shutdown_widget()
+        widget.stopping_threads[self.thread] = "Camera 1"
+        finished = mock.Mock()
+        widget.shutdown_finished.connect(finished)
+
+        self.assertFalse(widget.shutdown())
+        self.assertTrue(widget.shutdown_timer.isActive())
+        widget._check_shutdown()
+        finished.assert_not_called()
+
+        # Deadline passes while the thread is still blocked
+        widget.shutdown_deadline = time.monotonic() - 1
+        widget._check_shutdown()
+        finished.assert_called_once()
+        widget._finish_shutdown.assert_called_once()
+        self.assertFalse(widget.shutdown_timer.isActive())
+        self.assertEqual(widget.stopping_threads, {})
+        self.assertEqual(widget.abandoned_threads, {self.thread: "Camera 1"})
+
+        # When it finally ends it is only released, shutdown doesn't run again
+        self.thread.release.set()
+        self.thread.wait()
+        widget._handle_thread_stopped("Camera 1", self.thread)
+        self.assertEqual(widget.abandoned_threads, {})
+        widget._finish_shutdown.assert_called_once()
+
+    def test_thread_ending_before_the_deadline_finishes_normally(self):
+        widget = shutdown_widget()
+        widget.stopping_threads[self.thread] = "Camera 1"
+        self.assertFalse(widget.shutdown())
+
+        self.thread.release.set()
+        self.thread.wait()
+        widget._handle_thread_stopped("Camera 1", self.thread)
+        self.assertTrue(widget.shut_down)
+        self.assertEqual(widget.abandoned_threads, {})
+
+
+class RestartTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.widget = shutdown_widget()
+        self.widget.log_message = mock.Mock()
+        self.widget.stop_camera = self.stop_camera
+        self.widget.start_camera = self.start_camera
+        self.threads = []
+        self.start_camera("Camera 1")
+
+    def tearDown(self):
+        for thread in self.threads:
+            thread.release.set()
+            thread.wait()
+
+    def stop_camera(self, camera_name):
+        self.widget.stopping_threads[self.widget.camera_threads.pop(camera_name)] = camera_name
+
+    def start_camera(self, camera_name):
+        thread = StuckThread()
+        thread.start()
+        self.threads.append(thread)
+        self.widget.camera_threads[camera_name] = thread
+
+    def test_stuck_thread_does_not_block_shutdown(self):
+        stuck = self.widget.camera_threads["Camera 1"]
+        self.widget._restart_camera("Camera 1")
+        self.assertEqual(self.widget.abandoned_threads, {stuck: "Camera 1"})
+        self.assertEqual(self.widget.stopping_threads, {})
+        self.assertIsNot(self.widget.camera_threads["Camera 1"], stuck)
+
+    def test_restarts_stop_while_replaced_threads_are_stuck(self):
+        for _ in range(5):
+            self.widget._restart_camera("Camera 1")
+        self.assertEqual(len(self.threads), 3)
+        self.assertEqual(len(self.widget.abandoned_threads), 2)
+
+        # Once a stuck thread ends the camera may be restarted again
+        stuck = self.threads[0]
+        stuck.release.set()
+        stuck.wait()
+        self.widget._handle_thread_stopped("Camera 1", stuck)
+        self.widget._restart_camera("Camera 1")
+        self.assertEqual(len(self.threads), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()